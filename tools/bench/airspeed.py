@@ -0,0 +1,23 @@
+# Airspeed Conversion Benchmarks
+# throughput of the batched airspeed conversions, with and without sharing one atmosphere pass
+# run from tools/ with: python -m bench.airspeed
+
+import numpy as np
+from bench.atmos import best
+from utils.airspeed import airspeed
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    pairs = [("cas", "tas"), ("tas", "cas"), ("cas", "mach"), ("mach", "cas"), ("eas", "tas"), ("tas", "mach")]
+    print(f"{'conversion':12s} {'n':>9s} {'shared (ms)':>12s} {'pts/s':>12s} {'fresh (ms)':>11s}")
+    for n in [10**3, 10**4, 10**5, 10**6]:
+        h = rng.uniform(0, 50000, n)
+        M = rng.uniform(0.1, 2.0, n)
+        asp = airspeed(h)
+        for frm, to in pairs:
+            V = asp.fromMach(M, frm)
+            # shared reuses the atmosphere pass, fresh rebuilds it for every conversion
+            ts = best(lambda: asp.convert(V, frm, to))
+            tf = best(lambda: airspeed(h).convert(V, frm, to))
+            print(f"{frm + '->' + to:12s} {n:9d} {ts*1e3:12.3f} {n/ts:12.0f} {tf*1e3:11.3f}")
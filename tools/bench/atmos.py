@@ -0,0 +1,32 @@
+# Atmosphere Benchmarks
+# times the analytic stdAtmos against the table-backed tableAtmos on array inputs
+# run from tools/ with: python -m bench.atmos
+
+import timeit
+import numpy as np
+from utils.stdatmos import stdAtmos, tableAtmos
+
+
+def best(fn, number=5, repeat=3):
+    """
+    Returns the best time per call (s) of fn.
+    """
+    return min(timeit.repeat(fn, number=number, repeat=repeat))/number
+
+
+if __name__ == "__main__":
+    std = stdAtmos()
+    tab = tableAtmos()
+    print("tableAtmos max relative error:")
+    for col, err in tab.maxRelErr.items():
+        print(f"  {col:4s} {err:.2e}")
+    print()
+    
+    rng = np.random.default_rng(0)
+    print(f"{'method':8s} {'n':>9s} {'stdAtmos (ms)':>14s} {'tableAtmos (ms)':>16s} {'speedup':>8s}")
+    for n in [10**3, 10**4, 10**5, 10**6]:
+        h = rng.uniform(0, 280000, n)
+        for method in ["state", "T", "P", "rho", "Aspeed", "VRkin"]:
+            ta = best(lambda: getattr(std, method)(h))
+            tb = best(lambda: getattr(tab, method)(h))
+            print(f"{method:8s} {n:9d} {ta*1e3:14.3f} {tb*1e3:16.3f} {ta/tb:8.1f}")
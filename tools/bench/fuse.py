@@ -0,0 +1,87 @@
+# Fuselage Drag Benchmarks
+# times the batched PSCylDrag against the old per-station loop version
+# run from tools/ with: python -m bench.fuse
+
+import numpy as np
+from bench.atmos import best
+from utils.stdatmos import stdAtmos
+from design.fuse import fuse
+
+
+def loopPSCylDrag(PSCyl, Mc, alt, S):
+    """
+    The PSCylDrag from before batchPSCylDrag, a fresh stdAtmos and three loops over the stations per call.
+    """
+    std = stdAtmos()
+    L = PSCyl.L
+    xs = PSCyl.xs
+    Ds = PSCyl.Ds
+    fr = PSCyl.fr
+    D = PSCyl.D
+    q = std.qMs(alt)*(Mc**2)
+    Ps = Ds*np.pi
+    Swets = np.zeros(((len(xs) - 1), 1))
+    for i in range(1, len(xs)):
+        Swets[i - 1] = Ps[i]*(xs[i] - xs[i - 1])
+    Swet = np.sum(Swets)
+    Vc = std.Aspeed(alt)*Mc
+    Res = np.zeros(((len(xs) - 1), 1))
+    for k in range(1, len(xs)):
+        Res[k - 1] = Vc*xs[k]/std.VRkin(alt)
+    Cfs = np.zeros_like(Res)
+    for j, Re in enumerate(Res):
+        if Re < 1000000:
+            Cfs[j] = 1.328/np.sqrt(Re)
+        else:
+            Cfs[j] = 0.455/((np.log10(Re)**2.58)*(1 + 0.144*Mc**2)**0.65)
+    ff = 1 + (60/fr**3) + fr/400
+    Drag = np.sum(Cfs*Swets*q*ff)
+    Amax = (np.pi*D**2)/4
+    cdw = 4*Amax/(np.pi*(L/2)**2)
+    Drag += Amax*cdw*q
+    return Swet, Drag
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+
+    # single fuselage, single condition
+    f = fuse()
+    f.PSCylGen(7, 11.5, [0.3, 0.2], 0.6)
+    tl = best(lambda: loopPSCylDrag(f, 0.82, 36000, 714.3), number=50)
+    tb = best(lambda: f.PSCylDrag(f, 0.82, 36000, 714.3), number=50)
+    err = abs(f.PSCylDrag(f, 0.82, 36000, 714.3)[1]/loopPSCylDrag(f, 0.82, 36000, 714.3)[1] - 1)
+    print(f"single call: loop {tl*1e6:.1f} us, batched {tb*1e6:.1f} us, speedup {tl/tb:.1f}x, rel diff {err:.1e}")
+    print()
+
+    # batches of fuselages x flight conditions, the loop version is timed on a sample and scaled up
+    print(f"{'fuses':>6s} {'conds':>6s} {'points':>9s} {'loop (ms)':>11s} {'batched (ms)':>13s} {'speedup':>8s}")
+    for nf, nc in [(10, 10), (100, 100), (1000, 100), (1000, 1000)]:
+        D = rng.uniform(5, 9, nf)
+        fr = rng.uniform(8, 14, nf)
+        Lcs = np.column_stack([rng.uniform(0.1, 0.4, nf), rng.uniform(0.1, 0.4, nf)])
+        M = rng.uniform(0.2, 0.9, nc)
+        h = rng.uniform(0, 45000, nc)
+        geom = fuse.batchPSCylGen(D[:, None], fr[:, None], Lcs[:, None, :], 0.6)
+        tb = best(lambda: fuse.batchPSCylDrag(geom, M, h), number=1)
+
+        fs = [fuse() for _ in range(10)]
+        for i, fi in enumerate(fs):
+            fi.PSCylGen(D[i], fr[i], Lcs[i], 0.6)
+        tl = best(lambda: [loopPSCylDrag(fi, M[0], h[0], 714.3) for fi in fs], number=1)/len(fs)*nf*nc
+        print(f"{nf:6d} {nc:6d} {nf*nc:9d} {tl*1e3:11.1f} {tb*1e3:13.2f} {tl/tb:8.0f}")
+
+    # accuracy per integrand evaluation, stations against adaptive quadrature
+    print()
+    geom = fuse.batchPSCylGen(7, 11.5, [0.3, 0.2], 0.6)
+    ref = fuse.batchPSCylDragQuad(geom, 0.82, 36000, tol=1e-13)[1]
+    print(f"{'method':18s} {'evals':>7s} {'rel error':>10s} {'err est':>9s} {'time (ms)':>10s}")
+    for N in [51, 501, 5001, 50001]:
+        g = fuse.batchPSCylGen(7, 11.5, [0.3, 0.2], 0.6, N=N)
+        t = best(lambda: fuse.batchPSCylDrag(g, 0.82, 36000))
+        Drag = fuse.batchPSCylDrag(g, 0.82, 36000)[1]
+        print(f"{'stations':18s} {N - 1:7d} {abs(Drag/ref - 1):10.1e} {'-':>9s} {t*1e3:10.3f}")
+    for tol in [1e-4, 1e-6, 1e-8, 1e-10]:
+        t = best(lambda: fuse.batchPSCylDragQuad(geom, 0.82, 36000, tol))
+        _, Drag, _, err, nevals = fuse.batchPSCylDragQuad(geom, 0.82, 36000, tol)
+        print(f"{f'quad tol={tol:.0e}':18s} {nevals:7d} {abs(Drag/ref - 1):10.1e} {err/Drag:9.1e} {t*1e3:10.3f}")
@@ -0,0 +1,41 @@
+# Inverse Atmosphere Benchmarks
+# times the closed form stdAtmos inverse solvers against a scalar root-finder loop
+# run from tools/ with: python -m bench.inverse
+
+import numpy as np
+from bench.atmos import best
+from utils.stdatmos import stdAtmos
+
+
+def bisect(fn, target, lo=-1000., hi=280000., tol=1e-6):
+    """
+    Scalar bisection for the altitude where a falling property fn(h) equals target, i.e. the old way.
+    """
+    while hi - lo > tol:
+        mid = (lo + hi)/2
+        if fn(mid) > target:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi)/2
+
+
+if __name__ == "__main__":
+    std = stdAtmos()
+    rng = np.random.default_rng(0)
+    
+    # scalar root-finder baseline on a small sample
+    h = rng.uniform(0, 280000, 100)
+    P = std.P(h)
+    tloop = best(lambda: [bisect(std.P, p) for p in P], number=1, repeat=1)/len(h)
+    print(f"scalar bisection on P: {1/tloop:12.0f} pts/s")
+    print()
+    
+    print(f"{'method':8s} {'n':>9s} {'time (ms)':>10s} {'pts/s':>12s} {'vs bisection':>13s}")
+    for n in [10**3, 10**4, 10**5, 10**6]:
+        h = rng.uniform(0, 280000, n)
+        P, rho = std.P(h), std.rho(h)
+        T = std.T(rng.uniform(0, 36000, n))
+        for method, x in [("presAlt", P), ("densAlt", rho), ("tempAlt", T)]:
+            t = best(lambda: getattr(std, method)(x))
+            print(f"{method:8s} {n:9d} {t*1e3:10.3f} {n/t:12.0f} {tloop*n/t:12.0f}x")
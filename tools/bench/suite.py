@@ -0,0 +1,265 @@
+# Benchmark Suite
+# times the atmosphere, component planform and drag, and the full drag buildup at several batch sizes, saves the
+# results as a JSON baseline and fails when a benchmark gets slower than the baseline by more than a threshold
+# run from tools/ with: python -m bench.suite [--save] [--threshold 0.25] [--only name] [--quick] [--retries 2]
+
+import sys
+import json
+import time
+import timeit
+import argparse
+import platform
+import numpy as np
+from pathlib import Path
+from utils.stdatmos import stdAtmos
+from design.wing import wing
+from design.fuse import fuse
+from design.tail import vertTail, horizTail
+from design.aircraft import aircraft, sweepDrag
+
+
+# default baseline file, next to this one
+baselinePath = Path(__file__).with_name("baseline.json")
+sizes = (1, 100, 10000)
+std = stdAtmos()
+
+
+def _example():
+    """
+    Returns the design/tail.py example wing, fuse, vtail, and htail.
+    """
+    w = wing()
+    w.planform(714.3, 8, 0.35, 31.5)
+    f = fuse()
+    f.PSCylGen(7, 11.5, [0.3, 0.2], 0.6)
+    v = vertTail(w, f)
+    v.planform(0.06, 0.45, 0.55, 40, 1.2)
+    h = horizTail(w, f)
+    h.planform(0.69, 0.5, 0.4, 36.5, 5)
+    return w, f, v, h
+
+
+def _conds(n:int, rng):
+    """
+    Returns n random cruise Mach numbers and altitudes, plain floats when n is 1 so the scalar paths are timed.
+    """
+    if n == 1:
+        return 0.82, 36000.
+    return rng.uniform(0.3, 0.9, n), rng.uniform(0, 45000, n)
+
+
+def _designs(n:int, rng):
+    """
+    Returns n random (S, ar, taper, LEsweep) wings and (D, fr, Lcs) fuses, plain floats when n is 1.
+    """
+    if n == 1:
+        return 714.3, 8., 0.35, 31.5, 7., 11.5, np.array([0.3, 0.2])
+    return (rng.uniform(600, 900, n), rng.uniform(6, 11, n), rng.uniform(0.2, 0.5, n), rng.uniform(20, 40, n),
+            rng.uniform(6, 9, n), rng.uniform(9, 14, n), rng.uniform(0.1, 0.4, (n, 2)))
+
+
+# every benchmark is setup(n, rng) returning the function to time at batch size n
+def atmosState(n, rng):
+    h = 36000. if n == 1 else rng.uniform(0, 280000, n)
+    return lambda: std.state(h)
+
+
+def atmosProps(n, rng):
+    h = 36000. if n == 1 else rng.uniform(0, 280000, n)
+    return lambda: (std.T(h), std.P(h), std.rho(h), std.Aspeed(h), std.VRkin(h), std.qMs(h))
+
+
+def wingPlanform(n, rng):
+    S, ar, taper, LEsweep = _designs(n, rng)[:4]
+    if n == 1:
+        return lambda: wing().planform(S, ar, taper, LEsweep)
+    return lambda: wing.batchPlanform(S, ar, taper, LEsweep)
+
+
+def wingDrag(n, rng):
+    w = _example()[0]
+    Mc, alt = _conds(n, rng)
+    if n == 1:
+        return lambda: w.drag(Mc, alt, 0.12, 0.4, 0., 0.8, 0.8)
+    return lambda: w.dragSurface(Mc, alt, 0.12, 0.4, 0., 0.8, 0.8)
+
+
+def fusePSCylGen(n, rng):
+    D, fr, Lcs = _designs(n, rng)[4:]
+    if n == 1:
+        return lambda: fuse().PSCylGen(D, fr, Lcs, 0.6)
+    return lambda: fuse.batchPSCylGen(D, fr, Lcs, 0.6)
+
+
+def fusePSCylDrag(n, rng):
+    f = _example()[1]
+    Mc, alt = _conds(n, rng)
+    if n == 1:
+        return lambda: f.PSCylDrag(f, Mc, alt, 714.3)
+    geom = f.geom()
+    return lambda: fuse.batchPSCylDrag(geom, Mc, alt)
+
+
+def tailPlanform(n, rng):
+    w, f = _example()[:2]
+    if n == 1:
+        return lambda: (vertTail(w, f).planform(0.06, 0.45, 0.55, 40, 1.2),
+                        horizTail(w, f).planform(0.69, 0.5, 0.4, 36.5, 5))
+    Cv, Ch = rng.uniform(0.04, 0.08, n), rng.uniform(0.5, 0.9, n)
+    return lambda: (vertTail.batchPlanform(Cv, 0.45, 0.55, 40, 1.2, w.b, w.S, f.L),
+                    horizTail.batchPlanform(Ch, 0.5, 0.4, 36.5, 5, w.mac, w.S, f.L))
+
+
+def tailDrag(n, rng):
+    v, h = _example()[2:]
+    Mc, alt = _conds(n, rng)
+    if n == 1:
+        return lambda: (v.drag(Mc, alt, 0.12, 0.35), h.drag(Mc, alt, 0.12, 0.35))
+    return lambda: (v.dragSurface(Mc, alt, 0.12, 0.35), h.dragSurface(Mc, alt, 0.12, 0.35))
+
+
+def aircraftDrag(n, rng):
+    ac = aircraft(*_example())
+    Mc, alt = _conds(n, rng)
+    return lambda: ac.drag(Mc, alt, (0.12, 0.4, 0., 0.8, 0.8), (0.12, 0.35), (0.12, 0.35))
+
+
+def aircraftSweep(n, rng):
+    S, ar, taper, LEsweep, D, fr, Lcs = _designs(max(n, 2), rng)
+    Mc, alt = _conds(max(n, 2), rng)
+    cols = {"S": S, "ar": ar, "taper": taper, "LEsweep": LEsweep, "D": D, "fr": fr, "Lnose": Lcs[:, 0],
+            "Ltail": Lcs[:, 1], "Mc": Mc, "alt": alt}
+    cols = {k: v[:n] for k, v in cols.items()}
+    return lambda: sweepDrag(cols)
+
+
+benchmarks = {"atmos.state": atmosState, "atmos.props": atmosProps,
+              "wing.planform": wingPlanform, "wing.drag": wingDrag,
+              "fuse.PSCylGen": fusePSCylGen, "fuse.PSCylDrag": fusePSCylDrag,
+              "tail.planform": tailPlanform, "tail.drag": tailDrag,
+              "aircraft.drag": aircraftDrag, "aircraft.sweep": aircraftSweep}
+
+
+def measure(fn, mintime:float=0.02, repeat:int=10):
+    """
+    Returns the best time per call (s) of fn, the number of calls per repeat grows until one repeat takes mintime so
+    fast benchmarks aren't lost in the timer resolution.
+    """
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        t = timer.timeit(number)
+        if t >= mintime or number >= 1e6:
+            break
+        number *= max(2, int(mintime/max(t, 1e-9)))
+    return min(timer.repeat(repeat=repeat, number=number))/number
+
+
+def machine():
+    """
+    Returns what the timings depend on, a baseline from a different machine is only a rough guide.
+    """
+    return {"platform": platform.platform(), "processor": platform.processor(), "python": platform.python_version(),
+            "numpy": np.__version__}
+
+
+def run(only:str=None, sizes:tuple=sizes, mintime:float=0.02, repeat:int=10, out=sys.stdout):
+    """
+    Runs the benchmarks whose name contains only (all by default) at every batch size.
+
+    Returns
+    -------
+    results : dict
+        {name: {n: seconds per call}}, n as a string so it round trips through JSON.
+    """
+    results = {}
+    for name, setup in benchmarks.items():
+        if only and only not in name:
+            continue
+        results[name] = {}
+        for n in sizes:
+            t = measure(setup(n, np.random.default_rng(0)), mintime, repeat)
+            results[name][str(n)] = t
+            if out:
+                out.write(f"{name:16s} {n:8d} {t*1e6:12.2f} us {t/n*1e9:12.1f} ns/point\n")
+    return results
+
+
+def compare(results:dict, baseline:dict, threshold:float=0.25):
+    """
+    Compares results against a baseline.
+
+    Parameters
+    ----------
+    results : dict
+        From run().
+    baseline : dict
+        The "results" of a saved baseline.
+    threshold : float
+        Allowed slowdown, 0.25 fails anything more than 25% slower than the baseline.
+
+    Returns
+    -------
+    rows : list
+        (name, n, baseline time, time, ratio, regressed) of every benchmark in both.
+    """
+    rows = []
+    for name, times in results.items():
+        for n, t in times.items():
+            t0 = baseline.get(name, {}).get(n)
+            if t0 is not None:
+                rows.append((name, int(n), t0, t, t/t0, t/t0 > 1 + threshold))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Times the hot paths and checks them against a saved baseline.")
+    parser.add_argument("--baseline", type=Path, default=baselinePath, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="allowed slowdown vs the baseline, 0.25 = 25%% (default: the baseline's, or 0.25)")
+    parser.add_argument("--only", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="shorter timing runs, noisier")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="times a regressed benchmark is measured again before it counts, the best time is kept")
+    args = parser.parse_args()
+
+    print(f"{'benchmark':16s} {'n':>8s} {'time/call':>15s} {'time/point':>20s}")
+    t0 = time.perf_counter()
+    mintime, repeat = (0.005, 5) if args.quick else (0.02, 10)
+    results = run(args.only, mintime=mintime, repeat=repeat)
+    print(f"ran in {time.perf_counter() - t0:.1f} s")
+
+    if args.save:
+        # merge so a partial --only run doesn't drop the other baselines
+        old = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        threshold = old.get("threshold", 0.25) if args.threshold is None else args.threshold
+        base = {"machine": machine(), "threshold": threshold,
+                "results": {**old.get("results", {}), **results}}
+        args.baseline.write_text(json.dumps(base, indent=2) + "\n")
+        print(f"saved baseline to {args.baseline}")
+        sys.exit(0)
+
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}, run with --save to make one")
+        sys.exit(0)
+    base = json.loads(args.baseline.read_text())
+    threshold = base.get("threshold", 0.25) if args.threshold is None else args.threshold
+    if base.get("machine") != machine():
+        print("warning: the baseline was saved on a different machine or environment")
+
+    print()
+    print(f"{'benchmark':16s} {'n':>8s} {'base (us)':>12s} {'now (us)':>12s} {'ratio':>7s}")
+    rows = compare(results, base["results"], threshold)
+    # timings on a busy machine come in slow streaks, so a regression has to show up again to count
+    for _ in range(args.retries):
+        for name, n, _, t, _, bad in rows:
+            if bad:
+                fn = benchmarks[name](n, np.random.default_rng(0))
+                results[name][str(n)] = min(t, measure(fn, mintime, repeat))
+        rows = compare(results, base["results"], threshold)
+    for name, n, tb, t, ratio, bad in rows:
+        print(f"{name:16s} {n:8d} {tb*1e6:12.2f} {t*1e6:12.2f} {ratio:7.2f}{'  REGRESSED' if bad else ''}")
+    failed = [r for r in rows if r[-1]]
+    print(f"{len(failed)} of {len(rows)} benchmarks regressed more than {threshold:.0%}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,42 @@
+# Sweep Benchmarks
+# scaling of the process pool design sweep with worker count, on a latin hypercube of aircraft
+# run from tools/ with: python -m bench.sweep [points]
+
+import os
+import sys
+import time
+import numpy as np
+from utils.sweep import sweep, sample
+from design.aircraft import sweepDrag
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    cols = sample(n, S=(600, 900), ar=(6, 11), taper=(0.2, 0.5), LEsweep=(20, 40), D=(6, 9), fr=(9, 14),
+                  Ch=(0.5, 0.9), Cv=(0.04, 0.08), Mc=(0.5, 0.9), alt=(20000, 45000))
+    ncpu = os.cpu_count() or 1
+    print(f"{n} designs, {ncpu} cores")
+    
+    # one process, no pool, is the reference every run has to match
+    t0 = time.perf_counter()
+    ref = sweep(sweepDrag, cols, workers=1, progress=False)
+    t1 = time.perf_counter() - t0
+    print(f"{'workers':>8s} {'time (s)':>9s} {'designs/s':>10s} {'speedup':>8s} {'efficiency':>11s} {'match':>6s}")
+    print(f"{1:8d} {t1:9.2f} {n/t1:10.0f} {1.:8.2f} {1.:11.2f} {'ref':>6s}")
+    
+    workers = [w for w in (2**i for i in range(1, 12)) if w < ncpu] + ([ncpu] if ncpu > 1 else [])
+    for w in workers:
+        t0 = time.perf_counter()
+        out = sweep(sweepDrag, cols, workers=w, progress=False)
+        t = time.perf_counter() - t0
+        match = all(np.array_equal(out[k], ref[k], equal_nan=True) for k in ref)
+        print(f"{w:8d} {t:9.2f} {n/t:10.0f} {t1/t:8.2f} {t1/t/w:11.2f} {str(match):>6s}")
+    
+    # chunk size trade off at the full worker count, small chunks balance better but pay more pickling
+    print()
+    print(f"{'chunksize':>10s} {'chunks':>7s} {'time (s)':>9s}")
+    for c in [n//(64*ncpu), n//(16*ncpu), n//(4*ncpu), n//ncpu]:
+        c = max(c, 1)
+        t0 = time.perf_counter()
+        sweep(sweepDrag, cols, workers=ncpu, chunksize=c, progress=False)
+        print(f"{c:10d} {-(-n//c):7d} {time.perf_counter() - t0:9.2f}")
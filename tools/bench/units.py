@@ -0,0 +1,26 @@
+# Unit Conversion Benchmarks
+# resolved affine transforms from utils.units.convert against the chained conversion functions
+# run from tools/ with: python -m bench.units
+
+import numpy as np
+import utils.units as uu
+from bench.atmos import best
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    cases = [
+        ("degF->K", uu.degF2k, "degF", "K"),
+        ("K->degF", uu.k2degF, "K", "degF"),
+        ("degC->degF", uu.degC2degF, "degC", "degF"),
+        ("degF->degC", uu.degF2degC, "degF", "degC"),
+        ("psf->Pa", lambda x: x*uu.psf2pa, "psf", "Pa"),
+        ("kt->ft/s", lambda x: x*uu.kt2fts, "kt", "ft/s"),
+    ]
+    print(f"{'conversion':12s} {'n':>9s} {'chained (ms)':>13s} {'convert (ms)':>13s} {'speedup':>8s}")
+    for n in [10**3, 10**5, 10**6, 10**7]:
+        x = rng.uniform(-100, 1000, n)
+        for name, chain, frm, to in cases:
+            tc = best(lambda: chain(x))
+            tr = best(lambda: uu.convert(x, frm, to))
+            print(f"{name:12s} {n:9d} {tc*1e3:13.3f} {tr*1e3:13.3f} {tc/tr:8.1f}")
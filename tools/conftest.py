@@ -0,0 +1,2 @@
+# Test Configuration
+# puts tools/ on the path so the tests import utils. and design. the same way the modules do, run with python -m pytest
@@ -0,0 +1,152 @@
+# Aircraft Drag Buildup
+# every component's drag at a set of flight conditions from one shared atmosphere pass
+
+
+import numpy as np
+from utils.stdatmos import stdAtmos
+from design.wing import wing
+from design.fuse import fuse
+from design.tail import vertTail, horizTail
+from design.flight import flight
+from design.surface import stackSurfaces, surfaceCd0
+from design.status import valid
+
+
+class aircraft():
+    """
+    This class builds up the drag of an aircraft made of a wing, fuse, vertical tail, and horizontal tail. Each
+    component must already have its planform (or PSCylGen) set.
+    
+    Methods
+    -------
+    drag(Mc, alt, wingAF, vtailAF, htailAF, tol, atmos)
+        Returns the drag and CD0 of every component and the total over arrays of flight conditions.
+    """
+    
+    parts = ("wing", "fuse", "vtail", "htail")
+    
+    def __init__(self, wing:wing, fuse:fuse, vtail:vertTail, htail:horizTail):
+        self.wing = wing
+        self.fuse = fuse
+        self.vtail = vtail
+        self.htail = htail
+        
+        
+    def drag(self, Mc, alt, wingAF, vtailAF, htailAF, tol:float=None, atmos:stdAtmos=None):
+        """
+        This method evaluates the atmosphere and dynamic pressure once for the flight conditions and hands them to
+        every component, the three lifting surfaces go through the design.surface kernel together in one pass. Mc and
+        alt broadcast against each other and against any arrays in the airfoil inputs.
+        
+        Parameters
+        ----------
+        Mc : float or np.ndarray
+            Cruise Mach number.
+        alt : float or np.ndarray
+            Cruise altitude.
+        wingAF : tuple
+            (tc, tcmax, a0L, Swetref, e) of the wing, as in wing.flightDrag().
+        vtailAF : tuple
+            (tc, tcmax) of the vertical tail.
+        htailAF : tuple
+            (tc, tcmax) of the horizontal tail.
+        tol : float
+            Integrate the fuse skin friction to this relative tolerance with fuse.flightPSCylDragQuad(), the
+            PSCylGen stations are used when None.
+        atmos : stdAtmos
+            Atmosphere to use, the design.flight default (std day) when None.
+            
+        Returns
+        -------
+        drag : dict
+            Drag of the wing, fuse, vtail, and htail, and their total.
+        Cd0 : dict
+            Zero lift drag coefficient of each component on the wing area, and their total.
+        status : np.ndarray
+            Reason codes of all components for each point, status.OK where the totals are valid.
+        """
+        fc = flight(Mc, alt, atmos)
+        
+        # lifting surfaces in one kernel pass, stacked on a leading axis
+        surfs = (self.wing, self.vtail, self.htail)
+        geoms = [s.surface() for s in surfs]
+        shape = np.broadcast_shapes(fc.status.shape, *[np.shape(x) for x in (*wingAF, *vtailAF, *htailAF)],
+                                    *[np.shape(g[k]) for g in geoms for k in g])
+        geom = stackSurfaces(geoms, len(shape))
+        tc, tcmax = [np.stack([np.broadcast_to(np.asarray(af[i], dtype=float), shape)
+                               for af in (wingAF, vtailAF, htailAF)]) for i in (0, 1)]
+        Cd0s, Meff, tcsweep, statuses = surfaceCd0(fc, geom, tc, tcmax)
+        drag, Cd0, status = {}, {}, {}
+        for k, (p, s) in enumerate(zip(("wing", "vtail", "htail"), surfs)):
+            Cd0[p], status[p] = Cd0s[k], statuses[k]
+            drag[p] = Cd0[p]*s.S*fc.q
+        
+        # plus the wing induced drag
+        CDi, istatus = self.wing.inducedCd(Meff[0], tcsweep[0], *wingAF[2:])
+        status["wing"] = status["wing"] | istatus
+        Cd0["wing"] = np.where(valid(status["wing"]), Cd0["wing"], np.nan)
+        drag["wing"] = (Cd0["wing"] + CDi)*self.wing.S*fc.q
+        
+        # fuse, referenced to the wing area
+        if tol is None:
+            _, drag["fuse"], status["fuse"] = fuse.flightPSCylDrag(self.fuse.geom(), fc)
+        else:
+            _, drag["fuse"], status["fuse"], _, _ = fuse.flightPSCylDragQuad(self.fuse.geom(), fc, tol)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            Cd0["fuse"] = drag["fuse"]/(fc.q*self.wing.S)
+        
+        # totals
+        drag["total"] = sum(drag[p] for p in self.parts)
+        Cd0["total"] = sum(Cd0[p] for p in self.parts)
+        drag, Cd0 = {k: v[()] for k, v in drag.items()}, {k: v[()] for k, v in Cd0.items()}
+        
+        return drag, Cd0, np.bitwise_or.reduce(np.broadcast_arrays(*status.values()))[()]
+
+
+# design used for any parameter sweepDrag() isn't given, the design/tail.py example aircraft at cruise
+designDefaults = {"S": 714.3, "ar": 8., "taper": 0.35, "LEsweep": 31.5,
+                  "D": 7., "fr": 11.5, "Lnose": 0.3, "Ltail": 0.2, "n": 0.6,
+                  "Cv": 0.06, "IIfv": 0.45, "taperv": 0.55, "LEsweepv": 40., "ARv": 1.2,
+                  "Ch": 0.69, "IIfh": 0.5, "taperh": 0.4, "LEsweeph": 36.5, "ARh": 5.,
+                  "tc": 0.12, "tcmax": 0.4, "a0L": 0., "Swetref": 0.8, "e": 0.8, "tct": 0.12, "tcmaxt": 0.35,
+                  "Mc": 0.82, "alt": 36000.}
+
+
+def sweepDrag(cols:dict):
+    """
+    Sizes and evaluates the drag buildup of a batch of aircraft, one per point, for utils.sweep.sweep(). Every
+    component is built from batch geometry so the whole chunk is evaluated in array passes.
+    
+    Parameters
+    ----------
+    cols : dict
+        1D columns named like designDefaults, any that are missing use the default value.
+        
+    Returns
+    -------
+    out : dict
+        Wing span and MAC, fuse length, tail areas, drag and Cd0 of each component and the total, and status.
+    """
+    p = {k: np.asarray(cols.get(k, v), dtype=float) for k, v in designDefaults.items()}
+    
+    # size the components as batches, the planform() attributes are the batch columns
+    w = wing()
+    vars(w).update(wing.batchPlanform(p["S"], p["ar"], p["taper"], p["LEsweep"]))
+    f = fuse()
+    vars(f).update(fuse.batchPSCylGen(p["D"], p["fr"], np.stack([p["Lnose"], p["Ltail"]], axis=-1), p["n"]))
+    f.Lcs = (f.Lnose, f.Ltail)
+    v = vertTail(w, f)
+    vars(v).update(vertTail.batchPlanform(p["Cv"], p["IIfv"], p["taperv"], p["LEsweepv"], p["ARv"], w.b, w.S, f.L))
+    h = horizTail(w, f)
+    vars(h).update(horizTail.batchPlanform(p["Ch"], p["IIfh"], p["taperh"], p["LEsweeph"], p["ARh"], w.mac, w.S,
+                                           f.L))
+    
+    drag, Cd0, status = aircraft(w, f, v, h).drag(p["Mc"], p["alt"], (p["tc"], p["tcmax"], p["a0L"], p["Swetref"],
+                                                                      p["e"]), (p["tct"], p["tcmaxt"]),
+                                                  (p["tct"], p["tcmaxt"]))
+    
+    out = {"b": w.b, "mac": w.mac, "L": f.L, "Sv": v.S, "Sh": h.S}
+    out.update({"drag_" + k: x for k, x in drag.items()})
+    out.update({"Cd0_" + k: x for k, x in Cd0.items()})
+    out["status"] = status
+    return out
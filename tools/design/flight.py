@@ -0,0 +1,77 @@
+# Flight Conditions
+# the atmosphere and dynamic pressure at a set of (Mc, alt) points, evaluated once and shared by every component
+
+
+import math
+import numpy as np
+from collections import namedtuple
+from utils.stdatmos import stdAtmos
+from design.status import newStatus, flag, OK, RANGE, NONFINITE
+# set up standard atmosphere
+std = stdAtmos()
+
+
+# Mc and alt as given, a, nu, and qMs shaped like alt, q and status shaped like the broadcast (Mc, alt)
+flightCond = namedtuple("flightCond", ["Mc", "alt", "a", "nu", "qMs", "q", "status"])
+
+
+def isScalar(*xs):
+    """
+    Returns True when every input is a single value (a Python or numpy scalar, or a 0-d array), which is when the
+    scalar fast paths are taken.
+    """
+    return all(isinstance(x, (float, int)) or np.ndim(x) == 0 for x in xs)
+
+
+def flight(Mc, alt, atmos:stdAtmos=None):
+    """
+    Evaluates the atmosphere once for a set of flight conditions.
+
+    Parameters
+    ----------
+    Mc : float or np.ndarray
+        Cruise Mach number.
+    alt : float or np.ndarray
+        Cruise altitude.
+    atmos : stdAtmos
+        Atmosphere to use, std day by default.
+
+    Returns
+    -------
+    fc : flightCond
+        Named tuple of Mc, alt, speed of sound a, kinematic viscosity nu, Q/M^2 qMs, dynamic pressure q, and the
+        status of each (Mc, alt) point (Mach <= 0 or altitude above the atmosphere's ceiling, or a nan/inf atmosphere
+        value). A single point is all floats with a np.uint8 status.
+    """
+    atmos = std if atmos is None else atmos
+    if isScalar(Mc, alt):
+        return _flightScalar(float(Mc), float(alt), atmos)
+    Mc, alt = np.asarray(Mc, dtype=float), np.asarray(alt, dtype=float)
+
+    # one atmosphere pass over the altitudes, Q/M^2 is the sea level value scaled by the pressure ratio
+    st = atmos.state(alt)
+    qMs = atmos.qMs0*st.PR
+    q = qMs*Mc**2
+
+    status = newStatus(q.shape)
+    flag(status, (Mc <= 0) | (alt > atmos.ceiling), RANGE)
+    flag(status, ~(np.isfinite(Mc) & np.isfinite(st.a) & np.isfinite(st.nu) & np.isfinite(qMs)), NONFINITE)
+
+    return flightCond(Mc, alt, st.a, st.nu, qMs, q, status)
+
+
+def _flightScalar(Mc:float, alt:float, atmos:stdAtmos):
+    """
+    flight() for a single point, plain float math without the status arrays.
+    """
+    st = atmos.state(alt)
+    qMs = atmos.qMs0*st.PR
+    q = qMs*Mc**2
+
+    status = OK
+    if Mc <= 0 or alt > atmos.ceiling:
+        status |= RANGE
+    if not (math.isfinite(Mc) and math.isfinite(st.a) and math.isfinite(st.nu) and math.isfinite(qMs)):
+        status |= NONFINITE
+
+    return flightCond(Mc, alt, st.a, st.nu, qMs, q, np.uint8(status))
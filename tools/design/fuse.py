@@ -3,8 +3,10 @@
 # spbrooks4@gmail.com
 
 import numpy as np
-import matplotlib.pyplot as plt
 from utils.stdatmos import stdAtmos
+from utils.quadrature import adaptQuad
+from design.flight import flightCond, flight
+from design.status import newStatus, flag, valid, OK, GEOMETRY, NONFINITE
 
 
 class fuse():
@@ -13,15 +15,30 @@ class fuse():
     
     Methods
     -------
-    PSCylGen(D, fr, Lcs, n)
+    PSCylGen(D, fr, Lcs, n, N, spacing)
         Generates geometry and drag calcs for a power series cylinder fuse.
+    stations(N, spacing)
+        Returns uniform, cosine, or user x/L stations.
+    batchPSCylGen(D, fr, Lcs, n, N, spacing)
+        Generates many power series cylinder fuses at once.
+    draw()
+        Plots the fuse side view from the last PSCylGen() call.
     PSCylDrag()
         Estimates the wetted area, drag, and CD0 of a power series cylinder fuse.
+    geom()
+        Returns the last PSCylGen() fuse in the batchPSCylGen() format.
+    batchPSCylDrag(geom, Mc, alt, atmos)
+        Estimates the wetted area and drag of many power series cylinder fuses at many flight conditions.
+    batchPSCylDragQuad(geom, Mc, alt, tol, atmos)
+        Same as batchPSCylDrag() but integrated to a tolerance, with error estimates and evaluation counts.
+    flightPSCylDrag(geom, fc), flightPSCylDragQuad(geom, fc, tol)
+        Same as the batch versions at flight conditions from design.flight.flight().
     """
     
-    def PSCylGen(self, D, fr, Lcs, n):
+    def PSCylGen(self, D, fr, Lcs, n, N:int=51, spacing="uniform"):
         """
-        This method creates a simple power series cylinder fuselage and returns a plot of it.
+        This method creates a simple power series cylinder fuselage. The outline is stored for draw(), nothing is
+        plotted.
         
         Parameters
         ----------
@@ -33,6 +50,10 @@ class fuse():
             Numpy array of [nose, tail] intersection points as decimal percent of length.
         n : float
             Nose/tail "sharpness," decimal percent.
+        N : int
+            Number of x stations.
+        spacing : str or np.ndarray
+            Station spacing, "uniform", "cosine" (clustered at the nose and tail), or an array of x/L stations.
             
         Returns
         -------
@@ -46,52 +67,138 @@ class fuse():
             Fuselage fineness ratio.
         """
         
-        # determine the length
-        L = fr*D
-        fr = fr
-        
-        # define set of x locations and corresponding actual locations
-        xLs = np.arange(0, 1.001, 0.02)
-        xs = xLs*L
-        
-        # determine diameter at each point
-        Ds = np.zeros_like(xLs)
-        for i, x in enumerate(xs):
-            # if location is not along nose or tail
-            if x > Lcs[0]*L and x < (1 - Lcs[1])*L:
-                Ds[i] = D
-
-            # if along nose
-            elif x <= Lcs[0]*L:
-                Ds[i] = D*((x/(Lcs[0]*L))**n)
-
-            # if along tail
-            elif x >= (1 - Lcs[1])*L:
-                Ds[i] = D*(((L - x)/(Lcs[1]*L))**n)
+        # generate the single fuselage as a batch of one
+        geom = fuse.batchPSCylGen(D, fr, Lcs, n, N, spacing)
+        L = geom["L"]
+        xs = geom["xs"]
+        Ds = geom["Ds"]
+        self.status = geom["status"]
                 
-        # create array of positive and negative ys for plotting
+        # upper half outline for plotting
         ys = Ds/2
-        ysn = -1*Ds/2
-
-        # plot fuse shape
-        plt.plot(xs, ys, "k-")
-        plt.plot(xs, ysn, "k-")
-        plt.gca().set_aspect("equal")
-        plt.grid()
-        plt.xlim((-1, xs[-1] + 1))
-        plt.ylim((-D/2 - 1, D/2 + 1))
-        plt.xlabel("Length (ft)")
-        plt.ylabel("Height (ft)")
         
         # store fuse info
         self.L = L
         self.D = D
         self.fr = fr
+        self.Lcs = Lcs
+        self.n = n
         self.plot = np.array([xs, ys])
         self.xs = xs
         self.Ds = Ds
         
         return L, xs, Ds, fr, D
+    
+    
+    @staticmethod
+    def stations(N:int=51, spacing="uniform"):
+        """
+        This method returns the fuselage x stations as a fraction of length.
+        
+        Parameters
+        ----------
+        N : int
+            Number of stations.
+        spacing : str or np.ndarray
+            "uniform", "cosine" (clustered at the nose and tail), or an array of x/L stations which is checked and
+            returned as is.
+            
+        Returns
+        -------
+        xLs : np.ndarray
+            Stations from 0 to 1.
+        """
+        if not isinstance(spacing, str):
+            xLs = np.asarray(spacing, dtype=float)
+            if xLs.ndim != 1 or len(xLs) < 2 or np.any(np.diff(xLs) <= 0) or xLs[0] < 0 or xLs[-1] > 1:
+                raise ValueError("stations must be an increasing 1D array of at least 2 values in [0, 1]")
+            return xLs
+        if N < 2:
+            raise ValueError("N must be at least 2")
+        if spacing == "uniform":
+            return np.linspace(0, 1, N)
+        if spacing == "cosine":
+            return (1 - np.cos(np.linspace(0, np.pi, N)))/2
+        raise ValueError(f"unknown spacing {spacing!r}, use \"uniform\", \"cosine\" or an array of stations")
+    
+    
+    @staticmethod
+    def batchPSCylGen(D, fr, Lcs, n, N:int=51, spacing="uniform"):
+        """
+        This method creates many power series cylinder fuselages at once. D, fr, n, and the [nose, tail] pairs of Lcs
+        broadcast against each other and every fuselage shares the same x/L stations. Nothing is plotted and no fuse
+        objects are made. Fuselages with bad geometry (e.g. a zero length nose) are flagged in status and left as nan.
+        
+        Parameters
+        ----------
+        D : float or np.ndarray
+            Max diameter.
+        fr : float or np.ndarray
+            Fineness ratio.
+        Lcs : np.ndarray
+            [nose, tail] intersection points as decimal percent of length, last axis of size 2.
+        n : float or np.ndarray
+            Nose/tail "sharpness," decimal percent.
+        N : int
+            Number of x stations.
+        spacing : str or np.ndarray
+            Station spacing, see stations().
+            
+        Returns
+        -------
+        geom : dict
+            D, fr, n, Lnose, Ltail, L, and status shaped like the broadcast inputs, xs and Ds with an extra trailing
+            station axis.
+        """
+        Lcs = np.asarray(Lcs, dtype=float)
+        D, fr, Ln, Lt, n = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in
+                                                 (D, fr, Lcs[..., 0], Lcs[..., 1], n)])
+        
+        # flag the fuselages that can't be generated
+        status = newStatus(D.shape)
+        flag(status, (D <= 0) | (fr <= 0) | (Ln <= 0) | (Lt <= 0) | (Ln + Lt > 1) | (n < 0), GEOMETRY)
+        finite = np.isfinite(D) & np.isfinite(fr) & np.isfinite(Ln) & np.isfinite(Lt) & np.isfinite(n)
+        flag(status, ~finite, NONFINITE)
+        
+        # determine the length and the actual x locations
+        L = fr*D
+        xs = L[..., None]*fuse.stations(N, spacing)
+        
+        # determine diameter at each point
+        Ds = fuse._diam(xs, *[x[..., None] for x in (D, L, Ln, Lt, n)])
+        Ds[~valid(status)] = np.nan
+        
+        return {"D": D, "fr": fr, "n": n, "Lnose": Ln, "Ltail": Lt, "L": L, "xs": xs, "Ds": Ds, "status": status}
+    
+    
+    @staticmethod
+    def _diam(x, D, L, Ln, Lt, n):
+        """
+        Returns the power series cylinder diameter at x, D*(distance into nose or tail/its length)^n and D along the
+        cylinder. Everything broadcasts.
+        """
+        # nose and tail intersections
+        xn = Ln*L
+        xt = (1 - Lt)*L
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = np.where(x <= xn, x/xn, np.where(x >= xt, (L - x)/(Lt*L), 1.))
+            return D*r**n
+    
+    
+    def draw(self):
+        """
+        This method plots the fuse side view stored by PSCylGen() on the current matplotlib figure.
+        """
+        import matplotlib.pyplot as plt
+        xs, ys = self.plot
+        plt.plot(xs, ys, "k-")
+        plt.plot(xs, -ys, "k-")
+        plt.gca().set_aspect("equal")
+        plt.grid()
+        plt.xlim((-1, xs[-1] + 1))
+        plt.ylim((-self.D/2 - 1, self.D/2 + 1))
+        plt.xlabel("Length (ft)")
+        plt.ylabel("Height (ft)")
 
 
     def PSCylDrag(self, PSCyl, Mc, alt, S):
@@ -117,49 +224,227 @@ class fuse():
             Fuselage total drag.
         """
         
-        # get stuff from function
-        L = PSCyl.L
-        xs = PSCyl.xs
-        Ds = PSCyl.Ds
-        fr = PSCyl.fr
-        D = PSCyl.D
-        std = stdAtmos()
-        q = std.qMs(alt)*(Mc**2)
+        # get stuff from function and run it as a batch of one
+        Swet, Drag, _ = fuse.batchPSCylDrag(PSCyl.geom(), Mc, alt)
         
-        # determine perimeter @ each location
-        Ps = Ds*np.pi
+        return Swet, Drag
+    
+    
+    def geom(self):
+        """
+        This method returns the fuse from the last PSCylGen() call as a batch of one, in the batchPSCylGen() format.
+        """
+        return {"D": self.D, "fr": self.fr, "n": self.n, "Lnose": self.Lcs[0], "Ltail": self.Lcs[1], "L": self.L,
+                "xs": self.xs, "Ds": self.Ds, "status": self.status}
+    
+    
+    @staticmethod
+    def batchPSCylDrag(geom, Mc, alt, atmos:stdAtmos=None):
+        """
+        This method estimates the drag of many power series cylinder fuselages at many flight conditions. The
+        fuselage batch shape of geom and the Mc and alt arrays broadcast against each other, so every fuselage at every
+        condition is batchPSCylDrag(batchPSCylGen(D[:, None], ...), Mc, alt) for 1D D, Mc, and alt. The atmosphere is
+        evaluated once for the alt array and the station sums are done as array ops.
         
-        # determine wetted area @ each location
-        Swets = np.zeros(((len(xs) - 1), 1))
-        for i in range(1, len(xs)):
-            Swets[i - 1] = Ps[i]*(xs[i] - xs[i - 1])
+        Parameters
+        ----------
+        geom : dict
+            Fuselages from batchPSCylGen(), needs L, xs, Ds, fr, and D (status is optional).
+        Mc : float or np.ndarray
+            Cruise mach number.
+        alt : float or np.ndarray
+            Cruise altitude.
+        atmos : stdAtmos
+            Atmosphere to use, the design.flight default (std day) when None.
+            
+        Returns
+        -------
+        Swet : np.ndarray
+            Fuselage wetted area, shaped like the fuselage batch.
+        Drag : np.ndarray
+            Fuselage total drag, shaped like the broadcast fuselages and flight conditions.
+        status : np.ndarray
+            Reason code for each drag point, status.OK where Drag is valid.
+        """
+        return fuse.flightPSCylDrag(geom, flight(Mc, alt, atmos))
+    
+    
+    @staticmethod
+    def flightPSCylDrag(geom, fc:flightCond):
+        """
+        This method is batchPSCylDrag() at flight conditions that were already evaluated by design.flight.flight(), so
+        several components can share one atmosphere pass.
         
-        # sum for total Swet
-        Swet = np.sum(Swets)
+        Parameters
+        ----------
+        geom : dict
+            Fuselages from batchPSCylGen(), needs L, xs, Ds, fr, and D (status is optional).
+        fc : flightCond
+            Flight conditions.
+            
+        Returns
+        -------
+        Swet : np.ndarray
+            Fuselage wetted area, shaped like the fuselage batch.
+        Drag : np.ndarray
+            Fuselage total drag, shaped like the broadcast fuselages and flight conditions.
+        status : np.ndarray
+            Reason code for each drag point, status.OK where Drag is valid.
+        """
+        L, xs, Ds, fr, D = [np.asarray(geom[k], dtype=float) for k in ("L", "xs", "Ds", "fr", "D")]
+        shape = np.broadcast_shapes(L.shape, fc.status.shape)
+        Mc, q = fc.Mc, fc.q
+        Vnu = fc.a*Mc/fc.nu
+        
+        # determine perimeter and wetted area @ each location, then sum for total Swet
+        Swets = Ds[..., 1:]*np.pi*np.diff(xs, axis=-1)
+        Swet = np.sum(Swets, axis=-1)
+        
+        # flag the points that can't be evaluated
+        status = newStatus(shape)
+        status |= np.asarray(geom.get("status", OK), dtype=np.uint8)
+        status |= fc.status
+        ok = valid(status)
+        
+        # only evaluate the valid points, stations stay on the last axis
+        Swets, xs = [np.broadcast_to(x, shape + x.shape[-1:])[ok] for x in (Swets, xs)]
+        L, fr, D, Mc, q, Vnu = [np.broadcast_to(x, shape)[ok] for x in (L, fr, D, Mc, q, Vnu)]
+        
+        # get Re and Cf at each station, laminar below Re = 1e6 and turbulent above
+        Res = Vnu[:, None]*xs[:, 1:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            Cfs = np.where(Res < 1000000, 1.328/np.sqrt(Res),
+                           0.455/((np.log10(Res)**2.58)*(1 + 0.144*Mc[:, None]**2)**0.65))
+        
+        # get drag along fuse
+        ff = 1 + (60/fr**3) + fr/400
+        Drags = np.sum(Cfs*Swets, axis=-1)*q*ff
+        
+        # calc and add wave drag
+        Amax = (np.pi*D**2)/4
+        cdw = 4*Amax/(np.pi*(L/2)**2)
+        dw = Amax*cdw*q
+        
+        # scatter back, invalid points stay nan
+        Drag = np.full(shape, np.nan)
+        Drag[ok] = Drags + dw
+        
+        return Swet[()], Drag[()], status[()]
+    
+    
+    @staticmethod
+    def batchPSCylDragQuad(geom, Mc, alt, tol:float=1e-8, atmos:stdAtmos=None):
+        """
+        This method is batchPSCylDrag() without the stations. The wetted area of the power series nose and tail is
+        integrated in closed form and the Cf weighted wetted area by adaptive Gauss-Kronrod quadrature, split at the
+        nose, tail, and laminar to turbulent transition points, to a relative tolerance. Broadcasting is the same as
+        batchPSCylDrag().
+        
+        Parameters
+        ----------
+        geom : dict
+            Fuselages from batchPSCylGen(), needs L, fr, D, n, Lnose, and Ltail (status is optional).
+        Mc : float or np.ndarray
+            Cruise mach number.
+        alt : float or np.ndarray
+            Cruise altitude.
+        tol : float
+            Relative tolerance on the skin friction drag integral.
+        atmos : stdAtmos
+            Atmosphere to use, the design.flight default (std day) when None.
+            
+        Returns
+        -------
+        Swet : np.ndarray
+            Fuselage wetted area, shaped like the fuselage batch.
+        Drag : np.ndarray
+            Fuselage total drag, shaped like the broadcast fuselages and flight conditions.
+        status : np.ndarray
+            Reason code for each drag point, status.OK where Drag is valid.
+        err : np.ndarray
+            Error estimate of Drag.
+        nevals : np.ndarray
+            Number of integrand evaluations used for each drag point.
+        """
+        return fuse.flightPSCylDragQuad(geom, flight(Mc, alt, atmos), tol)
+    
+    
+    @staticmethod
+    def flightPSCylDragQuad(geom, fc:flightCond, tol:float=1e-8):
+        """
+        This method is batchPSCylDragQuad() at flight conditions that were already evaluated by
+        design.flight.flight(), so several components can share one atmosphere pass.
+        
+        Parameters
+        ----------
+        geom : dict
+            Fuselages from batchPSCylGen(), needs L, fr, D, n, Lnose, and Ltail (status is optional).
+        fc : flightCond
+            Flight conditions.
+        tol : float
+            Relative tolerance on the skin friction drag integral.
+            
+        Returns
+        -------
+        Swet : np.ndarray
+            Fuselage wetted area, shaped like the fuselage batch.
+        Drag : np.ndarray
+            Fuselage total drag, shaped like the broadcast fuselages and flight conditions.
+        status : np.ndarray
+            Reason code for each drag point, status.OK where Drag is valid.
+        err : np.ndarray
+            Error estimate of Drag.
+        nevals : np.ndarray
+            Number of integrand evaluations used for each drag point.
+        """
+        L, fr, D, n, Ln, Lt = [np.asarray(geom[k], dtype=float) for k in ("L", "fr", "D", "n", "Lnose", "Ltail")]
+        shape = np.broadcast_shapes(L.shape, n.shape, fc.status.shape)
+        Mc, q = fc.Mc, fc.q
+        Vnu = fc.a*Mc/fc.nu
+        
+        # wetted area, pi*D*x/L^n integrates to pi*D*L/(n + 1) over the nose and tail
+        Swet = np.pi*D*(L*(1 - Ln - Lt) + (Ln + Lt)*L/(n + 1))
+        
+        # flag the points that can't be evaluated
+        status = newStatus(shape)
+        status |= np.asarray(geom.get("status", OK), dtype=np.uint8)
+        flag(status, (D <= 0) | (L <= 0) | (Ln <= 0) | (Lt <= 0) | (Ln + Lt > 1) | (n < 0), GEOMETRY)
+        status |= fc.status
+        ok = valid(status)
+        
+        # only evaluate the valid points
+        L, fr, D, n, Ln, Lt, Mc, q, Vnu = [np.broadcast_to(x, shape)[ok] for x in (L, fr, D, n, Ln, Lt, Mc, q, Vnu)]
+        
+        # integrate Cf*pi*D over the length, laminar below Re = 1e6 and turbulent above
+        def f(x, i):
+            Re = Vnu[i, None]*x
+            with np.errstate(invalid="ignore"):
+                Cf = np.where(Re < 1000000, 1.328/np.sqrt(Re),
+                              0.455/((np.log10(Re)**2.58)*(1 + 0.144*Mc[i, None]**2)**0.65))
+            return Cf*np.pi*fuse._diam(x, *[y[i, None] for y in (D, L, Ln, Lt, n)])
+        
+        # split at the nose and tail intersections and the transition point, smoothed for the x^(n - 1/2) nose tip
+        # and (L - x)^n tail end
+        xtr = np.clip(1000000/Vnu, 0, L)
+        bp = np.sort(np.column_stack([np.zeros_like(L), Ln*L, (1 - Lt)*L, xtr, L]), axis=1)
+        owner = np.repeat(np.arange(len(L)), 4)
+        Cfs, Cferr, evals = adaptQuad(lambda x, k: f(x, owner[k]), bp[:, :-1].ravel(), bp[:, 1:].ravel(), owner,
+                                      len(L), rtol=tol, smooth=True)
         
-        # get Re
-        Vc = std.Aspeed(alt)*Mc
-        Res = np.zeros(((len(xs) - 1), 1))
-        for k in range(1, len(xs)):
-            Res[k - 1] = Vc*xs[k]/std.VRkin(alt)
-
-        # get Cf
-        Cfs = np.zeros_like(Res)
-        for j, Re in enumerate(Res):
-            if Re < 1000000:
-                Cfs[j] = 1.328/np.sqrt(Re)
-            else:
-                Cfs[j] = 0.455/((np.log10(Re)**2.58)*(1 + 0.144*Mc**2)**0.65)
-
         # get drag along fuse
         ff = 1 + (60/fr**3) + fr/400
-        Drags = Cfs*Swets*q*ff
-        Drag = np.sum(Drags)
         
         # calc and add wave drag
         Amax = (np.pi*D**2)/4
         cdw = 4*Amax/(np.pi*(L/2)**2)
         dw = Amax*cdw*q
-        Drag += dw
         
-        return Swet, Drag
\ No newline at end of file
+        # scatter back, invalid points stay nan
+        Drag = np.full(shape, np.nan)
+        Drag[ok] = Cfs*q*ff + dw
+        err = np.full(shape, np.nan)
+        err[ok] = Cferr*q*ff
+        nevals = np.zeros(shape, dtype=int)
+        nevals[ok] = evals
+        
+        return Swet[()], Drag[()], status[()], err[()], nevals[()]
\ No newline at end of file
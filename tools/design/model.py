@@ -0,0 +1,246 @@
+# Incremental Aircraft Model
+# dependency tracked planform and drag results, changing an input only recomputes what depends on it
+
+
+import numpy as np
+from utils.stdatmos import stdAtmos
+from design.wing import wing
+from design.fuse import fuse
+from design.tail import vertTail, horizTail
+from design.flight import flight
+from design.aircraft import aircraft, designDefaults
+
+
+class aircraftModel():
+    """
+    This class holds the inputs of an aircraft (named like design.aircraft.designDefaults) and the planform and drag
+    results computed from them as a dependency graph. set() only drops the cached results downstream of the inputs
+    that actually changed, and get() lazily recomputes whatever is missing, so nudging the wing area resizes both
+    tails and redoes the drag while the fuse geometry is reused.
+
+    Methods
+    -------
+    set(**inputs)
+        Changes inputs and invalidates the results that depend on them.
+    get(name)
+        Returns an input or a result, recomputing it and its stale dependencies if needed.
+    drag()
+        Returns the drag, Cd0, and status of every component and the total like aircraft.drag().
+    dependents(name)
+        Returns every result downstream of an input or result.
+    stats()
+        Returns the compute, reuse, and invalidation counters.
+    resetStats()
+        Zeroes the counters.
+    """
+
+    # result name: inputs and results it is computed from, each is computed by the method _<name>
+    nodes = {"wing": ("S", "ar", "taper", "LEsweep"),
+             "fuse": ("D", "fr", "Lnose", "Ltail", "n"),
+             "vtail": ("wing", "fuse", "Cv", "IIfv", "taperv", "LEsweepv", "ARv"),
+             "htail": ("wing", "fuse", "Ch", "IIfh", "taperh", "LEsweeph", "ARh"),
+             "flight": ("Mc", "alt"),
+             "wingDrag": ("wing", "flight", "tc", "tcmax", "a0L", "Swetref", "e"),
+             "fuseDrag": ("fuse", "flight"),
+             "fuseCd0": ("fuseDrag", "flight", "S"),
+             "vtailDrag": ("vtail", "flight", "tct", "tcmaxt"),
+             "htailDrag": ("htail", "flight", "tct", "tcmaxt"),
+             "total": ("wingDrag", "fuseCd0", "vtailDrag", "htailDrag")}
+
+    def __init__(self, atmos:stdAtmos=None, **inputs):
+        """
+        Parameters
+        ----------
+        atmos : stdAtmos
+            Atmosphere to use, the design.flight default (std day) when None.
+        **inputs : float or np.ndarray
+            Inputs that differ from designDefaults.
+        """
+        self.atmos = atmos
+        unknown = set(inputs) - set(designDefaults)
+        if unknown:
+            raise KeyError(f"unknown inputs {sorted(unknown)}")
+        self.inputs = {**designDefaults, **inputs}
+        self._values = {}
+
+        # reverse edges, who reads each input or result
+        self._readers = {k: [] for k in (*self.inputs, *self.nodes)}
+        for name, deps in self.nodes.items():
+            for d in deps:
+                self._readers[d].append(name)
+        self.resetStats()
+
+
+    def set(self, **inputs):
+        """
+        This method changes inputs. Results downstream of an input whose value actually changed are dropped, nothing
+        is recomputed until it is asked for.
+
+        Parameters
+        ----------
+        **inputs : float or np.ndarray
+            New input values.
+
+        Returns
+        -------
+        stale : list
+            Names of the results that were invalidated.
+        """
+        unknown = set(inputs) - set(self.inputs)
+        if unknown:
+            raise KeyError(f"unknown inputs {sorted(unknown)}")
+        stale = []
+        for k, v in inputs.items():
+            old = self.inputs[k]
+            if np.shape(old) == np.shape(v) and np.array_equal(old, v, equal_nan=True):
+                self.unchanged += 1
+                continue
+            self.inputs[k] = v
+            for name in self.dependents(k):
+                if self._values.pop(name, None) is not None:
+                    self.invalidations[name] += 1
+                    stale.append(name)
+        return stale
+
+
+    def get(self, name:str):
+        """
+        This method returns an input or a result, a cached result is reused and a missing one is computed after its
+        dependencies.
+
+        Parameters
+        ----------
+        name : str
+            Input name, or one of the results in nodes: "wing", "fuse", "vtail", and "htail" are the sized component
+            objects, "flight" the design.flight.flightCond, the *Drag results (drag, Cd0, status) tuples (fuseDrag is
+            (drag, status), fuseCd0 adds Cd0 on the wing area), and
+            "total" the aircraft.drag() style dicts.
+        """
+        if name in self.inputs:
+            return self.inputs[name]
+        if name not in self.nodes:
+            raise KeyError(f"unknown input or result {name}")
+        if name in self._values:
+            self.reuses[name] += 1
+            return self._values[name]
+        value = getattr(self, "_" + name)(*[self.get(d) for d in self.nodes[name]])
+        self.computes[name] += 1
+        self._values[name] = value
+        return value
+
+
+    def drag(self):
+        """
+        This method returns the drag buildup at the current inputs, recomputing only the stale parts.
+
+        Returns
+        -------
+        drag : dict
+            Drag of the wing, fuse, vtail, and htail, and their total.
+        Cd0 : dict
+            Zero lift drag coefficient of each component on the wing area, and their total.
+        status : np.ndarray
+            Reason codes of all components for each point, status.OK where the totals are valid.
+        """
+        return self.get("total")
+
+
+    def dependents(self, name:str):
+        """
+        This method returns every result that depends on name, directly or through other results, in breadth first
+        order.
+        """
+        out, todo = [], list(self._readers[name])
+        while todo:
+            n = todo.pop(0)
+            if n not in out:
+                out.append(n)
+                todo.extend(self._readers[n])
+        return out
+
+
+    def stats(self):
+        """
+        Returns
+        -------
+        stats : dict
+            computes, reuses, and invalidations of every result, their totals, the number of set() values that
+            didn't change anything, and the fraction of result requests served from the cache.
+        """
+        computed, reused = sum(self.computes.values()), sum(self.reuses.values())
+        return {"computes": dict(self.computes), "reuses": dict(self.reuses),
+                "invalidations": dict(self.invalidations), "computed": computed, "reused": reused,
+                "invalidated": sum(self.invalidations.values()), "unchanged": self.unchanged,
+                "reuseRate": reused/(computed + reused) if computed + reused else 0.}
+
+
+    def resetStats(self):
+        """
+        This method zeroes the counters, the cached results are kept.
+        """
+        self.computes = dict.fromkeys(self.nodes, 0)
+        self.reuses = dict.fromkeys(self.nodes, 0)
+        self.invalidations = dict.fromkeys(self.nodes, 0)
+        self.unchanged = 0
+
+
+    # results, every one builds new objects so cached results that still point at old ones stay consistent
+    def _wing(self, S, ar, taper, LEsweep):
+        w = wing()
+        w.planform(S, ar, taper, LEsweep)
+        return w
+
+
+    def _fuse(self, D, fr, Lnose, Ltail, n):
+        f = fuse()
+        f.PSCylGen(D, fr, [Lnose, Ltail], n)
+        return f
+
+
+    def _vtail(self, w, f, C, IIf, taper, LEsweep, AR):
+        v = vertTail(w, f)
+        v.planform(C, IIf, taper, LEsweep, AR)
+        return v
+
+
+    def _htail(self, w, f, C, IIf, taper, LEsweep, AR):
+        h = horizTail(w, f)
+        h.planform(C, IIf, taper, LEsweep, AR)
+        return h
+
+
+    def _flight(self, Mc, alt):
+        return flight(Mc, alt, self.atmos)
+
+
+    def _wingDrag(self, w, fc, tc, tcmax, a0L, Swetref, e):
+        return w.flightDrag(fc, tc, tcmax, a0L, Swetref, e)
+
+
+    def _fuseDrag(self, f, fc):
+        _, drag, status = fuse.flightPSCylDrag(f.geom(), fc)
+        return drag, status
+
+
+    def _fuseCd0(self, fuseDrag, fc, S):
+        # the wing area only normalizes Cd0, so changing it doesn't redo the station integration
+        drag, status = fuseDrag
+        with np.errstate(invalid="ignore", divide="ignore"):
+            Cd0 = drag/(fc.q*S)
+        return drag[()], Cd0[()], status[()]
+
+
+    def _vtailDrag(self, v, fc, tc, tcmax):
+        return v.flightDrag(fc, tc, tcmax)
+
+
+    def _htailDrag(self, h, fc, tc, tcmax):
+        return h.flightDrag(fc, tc, tcmax)
+
+
+    def _total(self, *parts):
+        drag = dict(zip(("wing", "fuse", "vtail", "htail"), [p[0] for p in parts]))
+        Cd0 = dict(zip(("wing", "fuse", "vtail", "htail"), [p[1] for p in parts]))
+        drag["total"] = sum(drag[p] for p in aircraft.parts)
+        Cd0["total"] = sum(Cd0[p] for p in aircraft.parts)
+        return drag, Cd0, np.bitwise_or.reduce(np.broadcast_arrays(*[p[2] for p in parts]))[()]
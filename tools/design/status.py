@@ -0,0 +1,71 @@
+# Batched Evaluation Status Codes
+# per point reason codes so a bad corner of a sweep gets flagged instead of aborting the whole batch
+
+
+import numpy as np
+
+
+# reason codes, bit flags so one point can carry more than one reason
+OK = 0
+SUPERSONIC = 1      # effective Mach >= 1, no subsonic lift curve slope
+THICKNESS = 2       # t/c < 0 or max thickness location outside (0, 1]
+GEOMETRY = 4        # non-positive size or a zero length nose/tail
+RANGE = 8           # flight condition out of range, e.g. Mach <= 0 or e <= 0
+NONFINITE = 16      # nan/inf input or atmosphere value
+
+names = {SUPERSONIC: "supersonic", THICKNESS: "thickness", GEOMETRY: "geometry", RANGE: "range",
+         NONFINITE: "nonfinite"}
+
+
+def newStatus(shape):
+    """
+    Returns an all OK status array of the given shape.
+    """
+    return np.zeros(shape, dtype=np.uint8)
+
+
+def flag(status:np.ndarray, bad, code:int):
+    """
+    Sets code on status wherever bad is True, in place. bad broadcasts against status.
+
+    Parameters
+    ----------
+    status : np.ndarray
+        Status array from newStatus().
+    bad : bool or np.ndarray
+        Points that fail the check.
+    code : int
+        Reason code to set.
+
+    Returns
+    -------
+    status : np.ndarray
+        The same status array.
+    """
+    np.bitwise_or(status, np.uint8(code), out=status, where=np.asarray(bad))
+    return status
+
+
+def valid(status):
+    """
+    Returns a boolean mask of the points with no reason code set.
+    """
+    return np.asarray(status) == OK
+
+
+def reasons(code:int):
+    """
+    Returns the list of reason names set in a single status code.
+    """
+    return [name for bit, name in names.items() if int(code) & bit]
+
+
+def summary(status):
+    """
+    Returns the number of points flagged with each reason, plus the number of valid points under "ok".
+    """
+    status = np.asarray(status)
+    counts = {"ok": int(np.count_nonzero(status == OK))}
+    for bit, name in names.items():
+        counts[name] = int(np.count_nonzero(status & bit))
+    return counts
@@ -0,0 +1,146 @@
+# Lifting Surface Drag Kernel
+# the zero lift drag pipeline shared by the wing and both tails, vectorized over surfaces and flight conditions
+
+
+import math
+import numpy as np
+from design.flight import flightCond, isScalar
+from design.status import newStatus, flag, valid, OK, SUPERSONIC, THICKNESS, GEOMETRY, NONFINITE
+
+
+# geometry entries every surface() dict has
+surfaceKeys = ("S", "Sref", "LEsweep", "mac", "cr", "taper", "semispan", "kF", "kCd0", "subsonic")
+
+
+def stackSurfaces(geoms, ndim:int=1):
+    """
+    Stacks a list of surface() dicts along a new leading axis so surfaceCd0() can evaluate them together. Entries of
+    the same key are broadcast against each other (array valued geometry is a batch of surfaces) and padded with 1s
+    to ndim trailing dimensions so they broadcast against ndim dimensional flight conditions.
+    """
+    stacked = {}
+    for k in surfaceKeys:
+        x = np.stack(np.broadcast_arrays(*[np.asarray(g[k], dtype=float) for g in geoms]))
+        stacked[k] = x.reshape((len(geoms),) + (1,)*(ndim - x.ndim + 1) + x.shape[1:])
+    return stacked
+
+
+def surfaceCd0(fc:flightCond, geom:dict, tc, tcmax):
+    """
+    Evaluates the zero lift drag coefficient of one or more lifting surfaces. The geometry entries, tc, tcmax, and the
+    flight conditions all broadcast against each other, so a stack of surfaces on a leading axis is evaluated at every
+    flight condition in one pass. Bad points are flagged in status and left as nan. A single point (every input a
+    scalar) skips the masks and arrays and returns floats with a np.uint8 status.
+
+    Parameters
+    ----------
+    fc : flightCond
+        Flight conditions from design.flight.flight().
+    geom : dict
+        Surface geometry, see wing.surface(), or surfaces stacked by stackSurfaces(). S is the surface area, Sref the
+        area Cd0 is referenced to, semispan the span of one panel (b/2, or h for a vertical tail), kF and kCd0 the
+        form factor and Cd0 fudge factors, and subsonic flags Meff >= 1 as SUPERSONIC when True.
+    tc : float or np.ndarray
+        Surface t/c.
+    tcmax : float or np.ndarray
+        Airfoil max thickness location.
+
+    Returns
+    -------
+    Cd0 : np.ndarray
+        Zero lift drag coefficient.
+    Meff : np.ndarray
+        Effective (normal to the leading edge) Mach number.
+    tcsweep : np.ndarray
+        Sweep of the max thickness line (deg).
+    status : np.ndarray
+        Reason code for each point, status.OK where Cd0 is valid.
+    """
+    if isScalar(fc.status, tc, tcmax, *[geom[k] for k in surfaceKeys]):
+        return _surfaceCd0Scalar(fc, geom, float(tc), float(tcmax))
+    g = {k: np.asarray(geom[k], dtype=float) for k in surfaceKeys}
+    tc, tcmax = np.asarray(tc, dtype=float), np.asarray(tcmax, dtype=float)
+    shape = np.broadcast_shapes(fc.status.shape, tc.shape, tcmax.shape, *[g[k].shape for k in surfaceKeys])
+
+    # get effective Mach
+    Meff = np.broadcast_to(fc.Mc*np.cos(np.radians(g["LEsweep"])), shape)
+
+    # flag the points that can't be evaluated
+    status = newStatus(shape)
+    status |= fc.status
+    flag(status, (g["subsonic"] != 0) & (Meff >= 1), SUPERSONIC)
+    flag(status, (tc < 0) | (tcmax <= 0) | (tcmax > 1), THICKNESS)
+    flag(status, (g["S"] <= 0) | (g["Sref"] <= 0) | (g["mac"] <= 0) | (g["cr"] <= 0) | (g["semispan"] <= 0), GEOMETRY)
+    finite = np.isfinite(tc) & np.isfinite(tcmax)
+    for k in surfaceKeys:
+        finite = finite & np.isfinite(g[k])
+    flag(status, ~finite, NONFINITE)
+
+    # only evaluate the valid points
+    ok = valid(status)
+    Mc, a, nu, tc, tcmax = [np.broadcast_to(x, shape)[ok] for x in (fc.Mc, fc.a, fc.nu, tc, tcmax)]
+    S, Sref, LEsweep, mac, cr, taper, semispan, kF, kCd0 = [np.broadcast_to(g[k], shape)[ok] for k in surfaceKeys[:-1]]
+
+    # get cruise speed and effective speed
+    Veff = Mc*a*np.cos(np.radians(LEsweep))
+
+    # Reynold's num
+    Remac = Veff*mac/nu
+
+    # calculate Cf, laminar below Re = 1e6 and turbulent above, each only where it applies so neither warns
+    lam = Remac < 1000000
+    Cf = np.empty_like(Remac)
+    Cf[lam] = 1.328/np.sqrt(Remac[lam])
+    Cf[~lam] = 0.455/((np.log10(Remac[~lam])**2.58)*(1 + 0.144*Meff[ok][~lam]**2)**0.65)
+
+    # also get Swet
+    Swet = np.where(tc <= 0.05, 2.003, 1.977 + 0.52*tc)*S
+
+    # calculate F??
+    tcs = np.degrees(np.arctan(np.tan(np.radians(LEsweep)) - tcmax*(cr*(1 - taper)/semispan)))
+    F = kF*(1 + 0.6/tcmax*tc + 100*tc**4)*(1.34*(Mc**0.18)*np.cos(np.radians(tcs))**0.28)
+
+    # scatter back, invalid points stay nan
+    Cd0 = np.full(shape, np.nan)
+    Cd0[ok] = kCd0*Cf*Swet*F/Sref
+    tcsweep = np.full(shape, np.nan)
+    tcsweep[ok] = tcs
+
+    return Cd0, Meff, tcsweep, status
+
+
+def _surfaceCd0Scalar(fc:flightCond, geom:dict, tc:float, tcmax:float):
+    """
+    surfaceCd0() for a single point, the same checks and formulas in plain float math.
+    """
+    S, Sref, LEsweep, mac, cr, taper, semispan, kF, kCd0, subsonic = [float(geom[k]) for k in surfaceKeys]
+    Mc = float(fc.Mc)
+    sweep = math.radians(LEsweep)
+    Meff = Mc*math.cos(sweep)
+
+    # flag the point if it can't be evaluated
+    status = int(fc.status)
+    if subsonic != 0 and Meff >= 1:
+        status |= SUPERSONIC
+    if tc < 0 or tcmax <= 0 or tcmax > 1:
+        status |= THICKNESS
+    if S <= 0 or Sref <= 0 or mac <= 0 or cr <= 0 or semispan <= 0:
+        status |= GEOMETRY
+    if not all(math.isfinite(x) for x in (tc, tcmax, S, Sref, LEsweep, mac, cr, taper, semispan, kF, kCd0, subsonic)):
+        status |= NONFINITE
+    if status != OK:
+        return math.nan, Meff, math.nan, np.uint8(status)
+
+    # Reynold's num and Cf, laminar below Re = 1e6 and turbulent above
+    Remac = Mc*fc.a*math.cos(sweep)*mac/fc.nu
+    if Remac < 1000000:
+        Cf = 1.328/math.sqrt(Remac)
+    else:
+        Cf = 0.455/((math.log10(Remac)**2.58)*(1 + 0.144*Meff**2)**0.65)
+
+    # Swet and F
+    Swet = (2.003 if tc <= 0.05 else 1.977 + 0.52*tc)*S
+    tcs = math.degrees(math.atan(math.tan(sweep) - tcmax*(cr*(1 - taper)/semispan)))
+    F = kF*(1 + 0.6/tcmax*tc + 100*tc**4)*(1.34*(Mc**0.18)*math.cos(math.radians(tcs))**0.28)
+
+    return kCd0*Cf*Swet*F/Sref, Meff, tcs, np.uint8(status)
@@ -3,15 +3,12 @@
 # spbrooks4@gmail.com
 # this is a certified mark fellows excel sheet
 
-import sys
-sys.path.append("C:\\Users\\spbro\\Documents\\BLBeakers\\tools\\")
 import numpy as np
-import matplotlib.pyplot as plt
 from utils.stdatmos import stdAtmos
-# set up standard atmosphere
-std = stdAtmos()
 from design.wing import wing
 from design.fuse import fuse
+from design.flight import flightCond, flight
+from design.surface import surfaceCd0
 
 
 class vertTail():
@@ -27,16 +24,75 @@ class vertTail():
        
     def planform(self, C, IIf, taper, LEsweep, AR):
         """
-        This method determines the planform characteristics of a wing given its design parameters. It returns the values
-        of these parameters as well as a plot of the wing plan view.
+        This method determines the planform characteristics of a tail given its design parameters. It returns the values
+        of these parameters and stores the plan view outline for draw(), nothing is plotted.
        
         # TODO: fix docs
         """
+        geom = vertTail.batchPlanform(C, IIf, taper, LEsweep, AR, self.wing.b, self.wing.S, self.fuse.L)
+        S, h, cr, ct, mac, ymac = geom["S"], geom["h"], geom["cr"], geom["ct"], geom["mac"], geom["ymac"]
+        LEsweep, qcsweep, TEsweep = geom["LEsweep"], geom["qcsweep"], geom["TEsweep"]
+       
+        # planform outline for plotting
+        xs = np.array([0, cr, cr + h*np.tan(np.radians(TEsweep)), h*np.tan(np.radians(LEsweep)), 0])
+        ys = np.array([0, 0, h, h, 0])
+       
+        # save vert tail info
+        self.S = S
+        self.AR = AR
+        self.taper = taper
+        self.LEsweep = LEsweep
+        self.h = h
+        self.cr = cr
+        self.ct = ct
+        self.mac = mac
+        self.ymac = ymac
+        self.qcsweep = qcsweep
+        self.TEsweep = TEsweep
+        self.plot = np.array([xs, ys])
+       
+        return h, cr, ct, mac, ymac, LEsweep, qcsweep, TEsweep
+   
+   
+    @staticmethod
+    def batchPlanform(C, IIf, taper, LEsweep, AR, bw, Sw, Lf):
+        """
+        This method sizes many vertical tails at once from arrays of tail parameters and wing and fuse geometry. All
+        inputs broadcast against each other, e.g. C[:, None] against wing and fuse candidate arrays gives every volume
+        coefficient on every candidate. Nothing is plotted and no tail objects are made.
+        
+        Parameters
+        ----------
+        C : float or np.ndarray
+            Vertical tail volume coefficient.
+        IIf : float or np.ndarray
+            Tail moment arm as a fraction of fuse length.
+        taper : float or np.ndarray
+            Taper ratio.
+        LEsweep : float or np.ndarray
+            Leading edge sweep (deg).
+        AR : float or np.ndarray
+            Aspect ratio.
+        bw : float or np.ndarray
+            Wing span.
+        Sw : float or np.ndarray
+            Wing area.
+        Lf : float or np.ndarray
+            Fuse length.
+        
+        Returns
+        -------
+        geom : dict
+            Columns of C, IIf, AR, taper, I, S, h, cr, ct, mac, ymac, LEsweep, qcsweep, and TEsweep.
+        """
+        C, IIf, taper, LEsweep, AR, bw, Sw, Lf = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in
+                                                                      (C, IIf, taper, LEsweep, AR, bw, Sw, Lf)])
+        
         # calculate I
-        I = IIf*self.fuse.L
+        I = IIf*Lf
        
         # calculate area
-        S = C*self.wing.b*self.wing.S/I
+        S = C*bw*Sw/I
        
         # calculate h
         h = np.sqrt(AR*S)
@@ -53,10 +109,17 @@ class vertTail():
         LEsweep = np.degrees(np.arctan(np.tan(np.radians(LEsweep)) - 0*(cr*(1 - taper)/h)))
         qcsweep = np.degrees(np.arctan(np.tan(np.radians(LEsweep)) - 0.25*(cr*(1 - taper)/h)))
         TEsweep = np.degrees(np.arctan(np.tan(np.radians(LEsweep)) - 1*(cr*(1 - taper)/h)))
-       
-        # plotting of planform
-        xs = np.array([0, cr, cr + h*np.tan(np.radians(TEsweep)), h*np.tan(np.radians(LEsweep)), 0])
-        ys = np.array([0, 0, h, h, 0])
+        
+        return {"C": C, "IIf": IIf, "AR": AR, "taper": taper, "I": I, "S": S, "h": h, "cr": cr, "ct": ct, "mac": mac,
+                "ymac": ymac, "LEsweep": LEsweep, "qcsweep": qcsweep, "TEsweep": TEsweep}
+   
+   
+    def draw(self):
+        """
+        This method plots the tail plan view stored by planform() on the current matplotlib figure.
+        """
+        import matplotlib.pyplot as plt
+        xs, ys = self.plot
         plt.plot(xs, ys, "k-")
         plt.xlim([-1, xs[2] + 1])
         plt.ylim([0, ys[2] + 1])
@@ -65,23 +128,7 @@ class vertTail():
         plt.xlabel("Chordwise Location (ft)")
         plt.ylabel("Spanwise Location (ft)")
        
-        # save vert tail info
-        self.S = S
-        self.AR = AR
-        self.taper = taper
-        self.LEsweep = LEsweep
-        self.h = h
-        self.cr = cr
-        self.ct = ct
-        self.mac = mac
-        self.ymac = ymac
-        self.qcsweep = qcsweep
-        self.TEsweep = TEsweep
-        self.plot = np.array([xs, ys])
        
-        return h, cr, ct, mac, ymac, LEsweep, qcsweep, TEsweep
-   
-   
     def drag(self, Mc, alt, tc, tcmax):
         """
         This method determines the drag characteristics of the planform determined in the planform() method. It returns
@@ -111,35 +158,78 @@ class vertTail():
         Cd0 : float
             Wing zero lift drag coefficient.
         """
-        # get cruise speed and effective speed and Mach
-        Vc = Mc*std.Aspeed(alt)
-        Veff = Vc*np.cos(np.radians(self.LEsweep))
-        Meff = Mc*np.cos(np.radians(self.LEsweep))
-       
-        # Reynold's num
-        Remac = Veff*self.mac/std.VRkin(alt)
+        # scalar inputs take the kernel's single point path
+        drag, Cd0, _ = self.dragSurface(Mc, alt, tc, tcmax)
        
-        # calculate Cf
-        if Remac < 1000000:
-            Cf = 1.328/np.sqrt(Remac)
-        else:
-            Cf = 0.455/((np.log10(Remac)**2.58)*(1 + 0.144*Meff**2)**0.65)
-
-        # also get Swet
-        if tc <= 0.05:
-            Swet = 2.003*self.S
-        else:
-            Swet = (1.977 + 0.52*tc)*self.S
+        return drag, Cd0
+   
+   
+    def dragSurface(self, Mc, alt, tc, tcmax, atmos:stdAtmos=None):
+        """
+        This method is the array version of drag(). Every input broadcasts against the others and the atmosphere is
+        evaluated once for the alt array. Bad points are flagged in status and left as nan.
+        
+        Parameters
+        ----------
+        alt : float or np.ndarray
+            Cruise altitude.
+        Mc : float or np.ndarray
+            Cruise Mach number.
+        tc : float or np.ndarray
+            Tail t/c.
+        tcmax : float or np.ndarray
+            Airfoil max thickness location.
+        atmos : stdAtmos
+            Atmosphere to use, the design.flight default (std day) when None.
            
-        # calculate F??
-        tcsweep = np.degrees(np.arctan(np.tan(np.radians(self.LEsweep)) - tcmax*(self.cr*(1 - self.taper)/self.h)))
-        F = 1.1*(1 + 0.6/tcmax*tc + 100*tc**4)*(1.34*(Mc**0.18)*np.cos(np.radians(tcsweep))**0.28)
-       
-        # now get wing CD0 adn drag
-        Cd0 = 1.05*Cf*Swet*F/self.wing.S
-        drag = Cd0*self.S*std.qMs(alt)*Mc**2
+        Returns
+        -------
+        drag : np.ndarray
+            Total tail drag.
+        Cd0 : np.ndarray
+            Tail zero lift drag coefficient.
+        status : np.ndarray
+            Reason code for each point, status.OK where drag and Cd0 are valid.
+        """
+        return self.flightDrag(flight(Mc, alt, atmos), tc, tcmax)
+   
+   
+    def flightDrag(self, fc:flightCond, tc, tcmax):
+        """
+        This method is dragSurface() at flight conditions that were already evaluated by design.flight.flight(), so
+        several components can share one atmosphere pass.
+        
+        Parameters
+        ----------
+        fc : flightCond
+            Flight conditions.
+        tc : float or np.ndarray
+            Tail t/c.
+        tcmax : float or np.ndarray
+            Airfoil max thickness location.
+           
+        Returns
+        -------
+        drag : np.ndarray
+            Total tail drag.
+        Cd0 : np.ndarray
+            Tail zero lift drag coefficient.
+        status : np.ndarray
+            Reason code for each point, status.OK where drag and Cd0 are valid.
+        """
+        # zero lift drag from the lifting surface kernel
+        Cd0, _, _, status = surfaceCd0(fc, self.surface(), tc, tcmax)
+        drag = Cd0*self.S*fc.q
        
-        return drag, Cd0
+        return np.asarray(drag)[()], np.asarray(Cd0)[()], np.asarray(status)[()]
+   
+   
+    def surface(self):
+        """
+        This method returns the planform from the last planform() call in the design.surface kernel format.
+        """
+        return {"S": self.S, "Sref": self.wing.S, "LEsweep": self.LEsweep, "mac": self.mac, "cr": self.cr,
+                "taper": self.taper, "semispan": self.h, "kF": 1.1, "kCd0": 1.05, "subsonic": False}
    
    
 class horizTail():
@@ -155,43 +245,18 @@ class horizTail():
        
     def planform(self, C, IIf, taper, LEsweep, AR):
         """
-        This method determines the planform characteristics of a wing given its design parameters. It returns the values
-        of these parameters as well as a plot of the wing plan view.
+        This method determines the planform characteristics of a tail given its design parameters. It returns the values
+        of these parameters and stores the plan view outline for draw(), nothing is plotted.
        
         # TODO: fix docs
         """
-        # calculate I
-        I = IIf*self.fuse.L
+        geom = horizTail.batchPlanform(C, IIf, taper, LEsweep, AR, self.wing.mac, self.wing.S, self.fuse.L)
+        S, b, cr, ct, mac, ymac = geom["S"], geom["b"], geom["cr"], geom["ct"], geom["mac"], geom["ymac"]
+        LEsweep, qcsweep, TEsweep = geom["LEsweep"], geom["qcsweep"], geom["TEsweep"]
        
-        # calculate area
-        S = C*self.wing.mac*self.wing.S/I
-       
-        # calculate b
-        b = np.sqrt(AR*S)
-       
-        # calculate root and tip chord
-        cr = 2*b/(AR*(1 + taper))
-        ct = cr*taper
-       
-        # calculate MAC and location
-        mac = 2*cr/3*(1 + taper + taper**2)/(1 + taper)
-        ymac = b/6*(1 + 2*taper)/(1 + taper)
-       
-        # calculate sweep angles
-        LEsweep = np.degrees(np.arctan(np.tan(np.radians(LEsweep)) - 0*(2*cr*(1 - taper)/b)))
-        qcsweep = np.degrees(np.arctan(np.tan(np.radians(LEsweep)) - 0.25*(2*cr*(1 - taper)/b)))
-        TEsweep = np.degrees(np.arctan(np.tan(np.radians(LEsweep)) - 1*(2*cr*(1 - taper)/b)))
-       
-        # plotting of planform
+        # planform outline for plotting
         xs = np.array([0, cr, cr + b/2*np.tan(np.radians(TEsweep)), b/2*np.tan(np.radians(LEsweep)), 0])
         ys = np.array([0, 0, b/2, b/2, 0])
-        plt.plot(xs, ys, "k-")
-        plt.xlim([-1, xs[2] + 1])
-        plt.ylim([0, ys[2] + 1])
-        plt.gca().set_aspect("equal")
-        plt.grid()
-        plt.xlabel("Chordwise Location (ft)")
-        plt.ylabel("Spanwise Location (ft)")
        
         # save horiz tail info
         self.S = S
@@ -210,6 +275,70 @@ class horizTail():
         return b, cr, ct, mac, ymac, LEsweep, qcsweep, TEsweep
    
    
+    @staticmethod
+    def batchPlanform(C, IIf, taper, LEsweep, AR, macw, Sw, Lf):
+        """
+        This method sizes many horizontal tails at once from arrays of tail parameters and wing and fuse geometry. All
+        inputs broadcast against each other, e.g. C[:, None] against wing and fuse candidate arrays gives every volume
+        coefficient on every candidate. The planform itself is the same as a wing's, so it comes from
+        wing.batchPlanform(). Nothing is plotted and no tail objects are made.
+        
+        Parameters
+        ----------
+        C : float or np.ndarray
+            Horizontal tail volume coefficient.
+        IIf : float or np.ndarray
+            Tail moment arm as a fraction of fuse length.
+        taper : float or np.ndarray
+            Taper ratio.
+        LEsweep : float or np.ndarray
+            Leading edge sweep (deg).
+        AR : float or np.ndarray
+            Aspect ratio.
+        macw : float or np.ndarray
+            Wing mean aerodynamic chord.
+        Sw : float or np.ndarray
+            Wing area.
+        Lf : float or np.ndarray
+            Fuse length.
+        
+        Returns
+        -------
+        geom : dict
+            Columns of C, IIf, AR, taper, I, S, b, cr, ct, mac, ymac, LEsweep, qcsweep, and TEsweep.
+        """
+        C, IIf, taper, LEsweep, AR, macw, Sw, Lf = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in
+                                                                        (C, IIf, taper, LEsweep, AR, macw, Sw, Lf)])
+        
+        # calculate I
+        I = IIf*Lf
+       
+        # calculate area
+        S = C*macw*Sw/I
+        
+        # planform from the area
+        geom = wing.batchPlanform(S, AR, taper, LEsweep)
+        geom["S"] = S
+        geom["AR"] = geom.pop("ar")
+        
+        return {"C": C, "IIf": IIf, "I": I, **geom}
+   
+   
+    def draw(self):
+        """
+        This method plots the tail plan view stored by planform() on the current matplotlib figure.
+        """
+        import matplotlib.pyplot as plt
+        xs, ys = self.plot
+        plt.plot(xs, ys, "k-")
+        plt.xlim([-1, xs[2] + 1])
+        plt.ylim([0, ys[2] + 1])
+        plt.gca().set_aspect("equal")
+        plt.grid()
+        plt.xlabel("Chordwise Location (ft)")
+        plt.ylabel("Spanwise Location (ft)")
+       
+       
     def drag(self, Mc, alt, tc, tcmax):
         """
         This method determines the drag characteristics of the planform determined in the planform() method. It returns
@@ -233,55 +362,102 @@ class horizTail():
         Cd0 : float
             Wing zero lift drag coefficient.
         """
-        # get cruise speed and effective speed and Mach
-        Vc = Mc*std.Aspeed(alt)
-        Veff = Vc*np.cos(np.radians(self.LEsweep))
-        Meff = Mc*np.cos(np.radians(self.LEsweep))
-       
-        # Reynold's num
-        Remac = Veff*self.mac/std.VRkin(alt)
+        # scalar inputs take the kernel's single point path
+        drag, Cd0, _ = self.dragSurface(Mc, alt, tc, tcmax)
        
-        # calculate Cf
-        if Remac < 1000000:
-            Cf = 1.328/np.sqrt(Remac)
-        else:
-            Cf = 0.455/((np.log10(Remac)**2.58)*(1 + 0.144*Meff**2)**0.65)
-
-        # also get Swet
-        if tc <= 0.05:
-            Swet = 2.003*self.S
-        else:
-            Swet = (1.977 + 0.52*tc)*self.S
+        return drag, Cd0
+   
+   
+    def dragSurface(self, Mc, alt, tc, tcmax, atmos:stdAtmos=None):
+        """
+        This method is the array version of drag(). Every input broadcasts against the others and the atmosphere is
+        evaluated once for the alt array. Bad points are flagged in status and left as nan.
+        
+        Parameters
+        ----------
+        alt : float or np.ndarray
+            Cruise altitude.
+        Mc : float or np.ndarray
+            Cruise Mach number.
+        tc : float or np.ndarray
+            Tail t/c.
+        tcmax : float or np.ndarray
+            Airfoil max thickness location.
+        atmos : stdAtmos
+            Atmosphere to use, the design.flight default (std day) when None.
            
-        # calculate F??
-        tcsweep = np.degrees(np.arctan(np.tan(np.radians(self.LEsweep)) - tcmax*(2*self.cr*(1 - self.taper)/self.b)))
-        F = 1.1*(1 + 0.6/tcmax*tc + 100*tc**4)*(1.34*(Mc**0.18)*np.cos(np.radians(tcsweep))**0.28)
-       
-        # now get wing CD0
-        Cd0 = 1.05*Cf*Swet*F/self.wing.S
-       
-        # calc drag
-        drag = Cd0*self.S*std.qMs(alt)*Mc**2
+        Returns
+        -------
+        drag : np.ndarray
+            Total tail drag.
+        Cd0 : np.ndarray
+            Tail zero lift drag coefficient.
+        status : np.ndarray
+            Reason code for each point, status.OK where drag and Cd0 are valid.
+        """
+        return self.flightDrag(flight(Mc, alt, atmos), tc, tcmax)
+   
+   
+    def flightDrag(self, fc:flightCond, tc, tcmax):
+        """
+        This method is dragSurface() at flight conditions that were already evaluated by design.flight.flight(), so
+        several components can share one atmosphere pass.
+        
+        Parameters
+        ----------
+        fc : flightCond
+            Flight conditions.
+        tc : float or np.ndarray
+            Tail t/c.
+        tcmax : float or np.ndarray
+            Airfoil max thickness location.
+           
+        Returns
+        -------
+        drag : np.ndarray
+            Total tail drag.
+        Cd0 : np.ndarray
+            Tail zero lift drag coefficient.
+        status : np.ndarray
+            Reason code for each point, status.OK where drag and Cd0 are valid.
+        """
+        # zero lift drag from the lifting surface kernel
+        Cd0, _, _, status = surfaceCd0(fc, self.surface(), tc, tcmax)
+        drag = Cd0*self.S*fc.q
        
-        return drag, Cd0
+        return np.asarray(drag)[()], np.asarray(Cd0)[()], np.asarray(status)[()]
+   
+   
+    def surface(self):
+        """
+        This method returns the planform from the last planform() call in the design.surface kernel format.
+        """
+        return {"S": self.S, "Sref": self.wing.S, "LEsweep": self.LEsweep, "mac": self.mac, "cr": self.cr,
+                "taper": self.taper, "semispan": self.b/2, "kF": 1.1, "kCd0": 1.05, "subsonic": False}
    
    
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+    
     plt.figure("Wing")
     wing = wing()
     wing.planform(714.3, 8, .35, 31.5)
+    wing.draw()
    
     plt.figure("Fuse")
     fuse = fuse()
     fuse.PSCylGen(7, 11.5, [0.3, 0.2], 0.6)
+    fuse.draw()
    
     plt.figure("Vert. Tail")
     vtail = vertTail(wing, fuse)
     vtail.planform(0.06, 0.45, 0.55, 40, 1.2)
+    vtail.draw()
    
     plt.figure("Horiz. Tail")
     htail = horizTail(wing, fuse)
     htail.planform(0.69, 0.5, 0.4, 36.5, 5)
+    htail.draw()
    
     plt.figure("Aircraft")
     plt.plot(fuse.plot[0], fuse.plot[1], "k")
@@ -297,12 +473,12 @@ if __name__ == "__main__":
     plt.ylabel("Width (ft)")
     plt.grid()
    
-    vdrag, vcd = vtail.drag(0.82, 36000, 0.12, 0.35)
-    hdrag, hcd = htail.drag(0.82, 36000, 0.12, 0.35)
-    wdrag, wcd = wing.drag(0.82, 36000, 0.12, 0.4, 0., 0.8, 0.8)
-    _, fdrag = fuse.PSCylDrag(fuse, 0.82, 36000, wing.S)
-    print(f"Total Drag: {vdrag + hdrag + wdrag + fdrag:.0f} lb")
-    print(f"CD0: {vcd + hcd + wcd:.4f}")
-    print(f"Design CD0: {1.2*(vcd + hcd + wcd):.4f}")
+    from design.aircraft import aircraft
+    drag, cd0, _ = aircraft(wing, fuse, vtail, htail).drag(0.82, 36000, (0.12, 0.4, 0., 0.8, 0.8), (0.12, 0.35),
+                                                           (0.12, 0.35))
+    cd0 = cd0["wing"] + cd0["vtail"] + cd0["htail"]
+    print(f"Total Drag: {drag['total']:.0f} lb")
+    print(f"CD0: {cd0:.4f}")
+    print(f"Design CD0: {1.2*cd0:.4f}")
    
     plt.show()
\ No newline at end of file
@@ -3,11 +3,12 @@
 # spbrooks4@gmail.com
 # this is a certified mark fellows excel sheet
 
+import math
 import numpy as np
-import matplotlib.pyplot as plt
 from utils.stdatmos import stdAtmos
-# set up standard atmosphere
-std = stdAtmos()
+from design.flight import flightCond, flight, isScalar
+from design.surface import surfaceCd0
+from design.status import newStatus, flag, valid, OK, SUPERSONIC, RANGE, NONFINITE
 
 
 class wing():
@@ -17,11 +18,23 @@ class wing():
     Methods
     -------
     planform(S, ar, taper, LEsweep)
-        Returns plot of wing planform, b, cr, ct, mac, ymac, LEsweep, qcsweep, and TEsweep.
+        Returns b, cr, ct, mac, ymac, LEsweep, qcsweep, and TEsweep.
+    batchPlanform(S, ar, taper, LEsweep, grid)
+        Returns columns of planform characteristics for arrays or a grid of designs.
+    draw()
+        Plots the wing planform from the last planform() call.
     cruiseCL(Swetref, e)
         Determines the cruise CL.
     drag(Mc, alt, tc, tcmax, cruiseCl, a0L)
         Returns wing total drag and Cd0.
+    dragSurface(Mc, alt, tc, tcmax, a0L, Swetref, e, atmos)
+        Returns wing total drag, Cd0, and per point status over broadcast arrays of flight conditions.
+    flightDrag(fc, tc, tcmax, a0L, Swetref, e)
+        Same as dragSurface() at flight conditions from design.flight.flight().
+    surface()
+        Returns the planform in the design.surface kernel format.
+    inducedCd(Meff, tcsweep, a0L, Swetref, e)
+        Returns the induced drag coefficient at the cruise CL.
     wingload(itertow)
         Returns the wingloading and weights throughout flight.
     groundroll(wingload, twrT, CLmaxs, alt)
@@ -31,7 +44,7 @@ class wing():
     def planform(self, S, ar, taper, LEsweep):
         """
         This method determines the planform characteristics of a wing given its design parameters. It returns the values
-        of these parameters as well as a plot of the wing plan view.
+        of these parameters and stores the plan view outline for draw(), nothing is plotted.
         
         Parameters
         ----------
@@ -64,6 +77,61 @@ class wing():
             Trailing edge sweep angle.
         """
         
+        geom = wing.batchPlanform(S, ar, taper, LEsweep)
+        b, cr, ct, mac, ymac = geom["b"], geom["cr"], geom["ct"], geom["mac"], geom["ymac"]
+        LEsweep, qcsweep, TEsweep = geom["LEsweep"], geom["qcsweep"], geom["TEsweep"]
+        
+        # planform outline for plotting
+        xs = np.array([0, cr, cr + b/2*np.tan(np.radians(TEsweep)), b/2*np.tan(np.radians(LEsweep)), 0])
+        ys = np.array([0, 0, b/2, b/2, 0])
+        
+        # save wing info
+        self.S = S
+        self.ar = ar
+        self.taper = taper
+        self.LEsweep = LEsweep
+        self.b = b
+        self.cr = cr
+        self.ct = ct
+        self.mac = mac
+        self.ymac = ymac
+        self.qcsweep = qcsweep
+        self.TEsweep = TEsweep
+        self.plot = np.array([xs, ys])
+        
+        return b, cr, ct, mac, ymac, LEsweep, qcsweep, TEsweep
+    
+    
+    @staticmethod
+    def batchPlanform(S, ar, taper, LEsweep, grid:bool=False):
+        """
+        This method determines the planform characteristics of many wings at once. Inputs broadcast against each other,
+        or with grid=True every combination of the 1D inputs is evaluated. Nothing is plotted and no wing objects are
+        made.
+        
+        Parameters
+        ----------
+        S : float or np.ndarray
+            Wing area.
+        ar : float or np.ndarray
+            Aspect ratio.
+        taper : float or np.ndarray
+            Taper ratio.
+        LEsweep : float or np.ndarray
+            Leading edge sweep (deg).
+        grid : bool
+            Evaluate the full S x ar x taper x LEsweep grid, flattened to 1D columns.
+        
+        Returns
+        -------
+        geom : dict
+            Columns of S, ar, taper, LEsweep, b, cr, ct, mac, ymac, qcsweep, and TEsweep.
+        """
+        if grid:
+            S, ar, taper, LEsweep = [x.ravel() for x in np.meshgrid(S, ar, taper, LEsweep, indexing="ij")]
+        else:
+            S, ar, taper, LEsweep = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (S, ar, taper, LEsweep)])
+        
         # calculate span
         b = np.sqrt(S*ar)
         
@@ -80,9 +148,16 @@ class wing():
         qcsweep = np.degrees(np.arctan(np.tan(np.radians(LEsweep)) - 0.25*(2*cr*(1 - taper)/b)))
         TEsweep = np.degrees(np.arctan(np.tan(np.radians(LEsweep)) - 1*(2*cr*(1 - taper)/b)))
         
-        # plotting of planform
-        xs = np.array([0, cr, cr + b/2*np.tan(np.radians(TEsweep)), b/2*np.tan(np.radians(LEsweep)), 0])
-        ys = np.array([0, 0, b/2, b/2, 0])
+        return {"S": S, "ar": ar, "taper": taper, "LEsweep": LEsweep, "b": b, "cr": cr, "ct": ct, "mac": mac,
+                "ymac": ymac, "qcsweep": qcsweep, "TEsweep": TEsweep}
+    
+    
+    def draw(self):
+        """
+        This method plots the wing plan view stored by planform() on the current matplotlib figure.
+        """
+        import matplotlib.pyplot as plt
+        xs, ys = self.plot
         plt.plot(xs, ys, "k-")
         plt.xlim([-1, xs[2] + 1])
         plt.ylim([0, ys[2] + 1])
@@ -90,22 +165,6 @@ class wing():
         plt.grid()
         plt.xlabel("Chordwise Location (ft)")
         plt.ylabel("Spanwise Location (ft)")
-        
-        # save wing info
-        self.S = S
-        self.ar = ar
-        self.taper = taper
-        self.LEsweep = LEsweep
-        self.b = b
-        self.cr = cr
-        self.ct = ct
-        self.mac = mac
-        self.ymac = ymac
-        self.qcsweep = qcsweep
-        self.TEsweep = TEsweep
-        self.plot = np.array([xs, ys])
-        
-        return b, cr, ct, mac, ymac, LEsweep, qcsweep, TEsweep
     
 
     def drag(self, Mc, alt, tc, tcmax, a0L, Swetref, e):
@@ -137,61 +196,186 @@ class wing():
         Cd0 : float
             Wing zero lift drag coefficient.
         """
-        # calculate Cd0
-        cd0 = 0.003*Swetref
-        
         # get K
         self.e = e
         self.K = 1/(np.pi*self.ar*e)
         
-        # determine cruise CL
-        cruiseCL = np.sqrt(cd0/(3*self.K))
-
-        # get cruise speed and effective speed and Mach
-        Vc = Mc*std.Aspeed(alt)
-        Veff = Vc*np.cos(np.radians(self.LEsweep))
-        Meff = Mc*np.cos(np.radians(self.LEsweep))
+        # scalar inputs take the kernel's single point path, supersonic is still an error here
+        drag, Cd0, status = self.dragSurface(Mc, alt, tc, tcmax, a0L, Swetref, e)
+        if np.any(status & SUPERSONIC):
+            raise Exception("Cruise speed is supersonic and idk what to do :(")
+        
+        return drag, Cd0
+    
+    
+    def dragSurface(self, Mc, alt, tc, tcmax, a0L, Swetref, e, atmos:stdAtmos=None):
+        """
+        This method is the array version of drag(). Every input broadcasts against the others, so a Mach x altitude
+        surface is dragSurface(Mc[:, None], alt[None, :], ...). The atmosphere is evaluated once for the alt array and
+        the Cf and Swet regimes are picked with masks instead of branches. Points that drag() would raise on or turn
+        into nan are flagged in status (see design.status) and left as nan, the rest of the batch is still evaluated.
         
-        # Reynold's num
-        Remac = Veff*self.mac/std.VRkin(alt)
+        Parameters
+        ----------
+        alt : float or np.ndarray
+            Cruise altitude.
+        Mc : float or np.ndarray
+            Cruise Mach number.
+        tc : float or np.ndarray
+            Wing t/c.
+        tcmax : float or np.ndarray
+            Airfoil max thickness location.
+        a0L : float or np.ndarray
+            Airfoil zero lift aoa.
+        Swetref : float or np.ndarray
+            Swet/Sref of the aircraft.
+        e : float or np.ndarray
+            Wing efficiency factor.
+        atmos : stdAtmos
+            Atmosphere to use, the design.flight default (std day) when None.
+            
+        Returns
+        -------
+        drag : np.ndarray
+            Total wing drag, shaped like the broadcast inputs.
+        Cd0 : np.ndarray
+            Wing zero lift drag coefficient, shaped like the broadcast inputs.
+        status : np.ndarray
+            Reason code for each point, status.OK where drag and Cd0 are valid.
+        """
+        return self.flightDrag(flight(Mc, alt, atmos), tc, tcmax, a0L, Swetref, e)
+    
+    
+    def flightDrag(self, fc:flightCond, tc, tcmax, a0L, Swetref, e):
+        """
+        This method is dragSurface() at flight conditions that were already evaluated by design.flight.flight(), so
+        several components can share one atmosphere pass. The rest of the inputs broadcast against the flight
+        conditions.
         
-        # calculate Cf
-        if Remac < 1000000:
-            Cf = 1.328/np.sqrt(Remac)
-        else:
-            Cf = 0.455/((np.log10(Remac)**2.58)*(1 + 0.144*Meff**2)**0.65)
-
-        # also get Swet
-        if tc <= 0.05:
-            Swet = 2.003*self.S
-        else:
-            Swet = (1.977 + 0.52*tc)*self.S
+        Parameters
+        ----------
+        fc : flightCond
+            Flight conditions.
+        tc : float or np.ndarray
+            Wing t/c.
+        tcmax : float or np.ndarray
+            Airfoil max thickness location.
+        a0L : float or np.ndarray
+            Airfoil zero lift aoa.
+        Swetref : float or np.ndarray
+            Swet/Sref of the aircraft.
+        e : float or np.ndarray
+            Wing efficiency factor.
             
-        # calculate F??
-        tcsweep = np.degrees(np.arctan(np.tan(np.radians(self.LEsweep)) - tcmax*(2*self.cr*(1 - self.taper)/self.b)))
-        F = (1 + 0.6/tcmax*tc + 100*tc**4)*(1.34*(Mc**0.18)*np.cos(np.radians(tcsweep))**0.28)
+        Returns
+        -------
+        drag : np.ndarray
+            Total wing drag, shaped like the broadcast inputs.
+        Cd0 : np.ndarray
+            Wing zero lift drag coefficient, shaped like the broadcast inputs.
+        status : np.ndarray
+            Reason code for each point, status.OK where drag and Cd0 are valid.
+        """
+        # zero lift drag from the lifting surface kernel, then the induced drag at the cruise CL
+        Cd0, Meff, tcsweep, status = surfaceCd0(fc, self.surface(), tc, tcmax)
+        CDi, istatus = self.inducedCd(Meff, tcsweep, a0L, Swetref, e)
+        status = status | istatus
         
-        # now get wing CD0
-        Cd0 = Cf*Swet*F/self.S
+        # get total CD and then total drag, invalid points stay nan
+        if isScalar(Cd0):
+            # single point from the scalar kernel path
+            Cd0 = Cd0 if status == OK else math.nan
+        else:
+            Cd0[~valid(status)] = np.nan
+        drag = (Cd0 + CDi)*self.S*fc.q
+        
+        return np.asarray(drag)[()], np.asarray(Cd0)[()], np.asarray(status)[()]
+    
+    
+    def surface(self):
+        """
+        This method returns the planform from the last planform() call in the design.surface kernel format.
+        """
+        return {"S": self.S, "Sref": self.S, "LEsweep": self.LEsweep, "mac": self.mac, "cr": self.cr,
+                "taper": self.taper, "semispan": self.b/2, "kF": 1., "kCd0": 1., "subsonic": True}
+    
+    
+    def inducedCd(self, Meff, tcsweep, a0L, Swetref, e):
+        """
+        This method returns the induced drag coefficient at the cruise CL that goes with a Cd0 from surfaceCd0(). All
+        inputs broadcast, points with a bad e or Swetref/Sref are flagged in status and left as nan. All scalar inputs
+        take a plain float path and return a float and a np.uint8 status.
         
-        # get beta if beta can exist
-        if Meff < 1:
+        Parameters
+        ----------
+        Meff : float or np.ndarray
+            Effective Mach number, must be subsonic.
+        tcsweep : float or np.ndarray
+            Sweep of the max thickness line (deg).
+        a0L : float or np.ndarray
+            Airfoil zero lift aoa.
+        Swetref : float or np.ndarray
+            Swet/Sref of the aircraft.
+        e : float or np.ndarray
+            Wing efficiency factor.
+            
+        Returns
+        -------
+        CDi : np.ndarray
+            Induced drag coefficient.
+        status : np.ndarray
+            Reason code for each point.
+        """
+        if isScalar(Meff, tcsweep, a0L, Swetref, e):
+            return self._inducedCdScalar(float(Meff), float(tcsweep), float(a0L), float(Swetref), float(e))
+        Meff, tcsweep, a0L, Swetref, e = [np.asarray(x, dtype=float) for x in (Meff, tcsweep, a0L, Swetref, e)]
+        status = newStatus(np.broadcast_shapes(Meff.shape, tcsweep.shape, a0L.shape, Swetref.shape, e.shape))
+        flag(status, (e <= 0) | (Swetref < 0), RANGE)
+        flag(status, ~(np.isfinite(a0L) & np.isfinite(Swetref) & np.isfinite(e)), NONFINITE)
+        
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # calculate Cd0, K, and cruise CL
+            cd0 = 0.003*Swetref
+            K = 1/(np.pi*self.ar*e)
+            cruiseCL = np.sqrt(cd0/(3*K))
+            
+            # get beta
             B = np.sqrt(1 - Meff**2)
-        else:
-            raise Exception("Cruise speed is supersonic and idk what to do :(")
             
-        # calc Cla
-        CLa = np.pi/180*2*np.pi*self.ar/(2 + np.sqrt(4 + self.ar**2*B**2*(1 + np.tan(np.radians(tcsweep))**2/B**2)))
+            # calc Cla
+            CLa = np.pi/180*2*np.pi*self.ar/(2 + np.sqrt(4 + self.ar**2*B**2*(1 + np.tan(np.radians(tcsweep))**2/B**2)))
+            
+            # get Clo and the trim CL
+            CLo = -CLa*a0L
+            atrim = (cruiseCL - CLo)/CLa
+            CLtrim = CLo + CLa*atrim
+            
+            CDi = np.where(valid(status), K*CLtrim**2, np.nan)
         
-        # get Clo
-        CLo = -CLa*a0L
+        return CDi, status
+    
+    
+    def _inducedCdScalar(self, Meff:float, tcsweep:float, a0L:float, Swetref:float, e:float):
+        """
+        inducedCd() for a single point, the same checks and formulas in plain float math.
+        """
+        status = OK
+        if e <= 0 or Swetref < 0:
+            status |= RANGE
+        if not (math.isfinite(a0L) and math.isfinite(Swetref) and math.isfinite(e)):
+            status |= NONFINITE
+        if status != OK or not abs(Meff) < 1:
+            # supersonic is already flagged by surfaceCd0()
+            return math.nan, np.uint8(status)
         
-        # now get the trim CL
+        # cruise CL, beta, CLa, and the trim CL
+        K = 1/(math.pi*self.ar*e)
+        cruiseCL = math.sqrt(0.003*Swetref/(3*K))
+        B = math.sqrt(1 - Meff**2)
+        tansweep = math.tan(math.radians(tcsweep))
+        CLa = math.pi/180*2*math.pi*self.ar/(2 + math.sqrt(4 + self.ar**2*B**2*(1 + tansweep**2/B**2)))
+        CLo = -CLa*a0L
         atrim = (cruiseCL - CLo)/CLa
         CLtrim = CLo + CLa*atrim
         
-        # get total CD and then total drag
-        Cd = Cd0 + self.K*CLtrim**2
-        drag = Cd*self.S*std.qMs(alt)*Mc**2
-        
-        return drag, Cd0
\ No newline at end of file
+        return K*CLtrim**2, np.uint8(status)
\ No newline at end of file
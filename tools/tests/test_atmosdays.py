@@ -0,0 +1,34 @@
+# Non-Standard Day Atmosphere Tests
+# ratios of an ISA + dT day stay ratios to the standard day, so every airspeed conversion agrees on them
+
+
+import numpy as np
+import utils.units as uu
+from utils.stdatmos import stdAtmos
+from utils.atmosdays import dayAtmos, dayGrid
+from utils.airspeed import airspeed
+
+
+def test_ratiosAgainstStandardDay():
+    std, hot = stdAtmos(), dayAtmos(20.)
+    assert hot.PR(0.) == 1.
+    assert np.isclose(hot.TR(0.), (std.T0 + 20)/std.T0)
+    assert np.isclose(hot.aR(0.), np.sqrt(hot.TR(0.)))
+    assert np.isclose(hot.dR(0.), 1/hot.TR(0.))
+
+
+def test_tas2easMatchesAirspeed():
+    h = np.array([0., 10000., 36000.])
+    for dT in (-15., 20.):
+        day = dayAtmos(dT)
+        eas = airspeed(h, day).convert(np.full(3, 500.), "tas", "eas")
+        assert np.allclose(uu.tas2eas(500., day, h*uu.ft2m), eas, rtol=1e-12)
+        assert np.allclose(uu.eas2tas(eas, day, h*uu.ft2m), 500., rtol=1e-12)
+
+
+def test_dayGridMatchesDayAtmos():
+    h, dT = np.linspace(0, 80000, 9), np.array([-20., 0., 15.])
+    for prop in ("T", "P", "rho", "dR", "aR", "VRkin"):
+        grid = dayGrid(prop, h, dT)
+        for j, d in enumerate(dT):
+            assert np.allclose(grid[:, j], getattr(dayAtmos(d), prop)(h), rtol=1e-13)
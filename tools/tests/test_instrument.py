@@ -0,0 +1,27 @@
+# Profiler Tests
+# batch sizes see through flightCond arguments, and module functions are recorded and restored wherever imported
+
+
+import numpy as np
+import design.wing as wingModule
+import design.flight as flightModule
+from design.wing import wing
+from design.flight import flight
+from design.surface import surfaceCd0
+from utils.instrument import callProfiler
+
+
+def test_flightCondBatchAndModuleFunctions():
+    w = wing()
+    w.planform(714.3, 8, 0.35, 31.5)
+    fc = flight(np.linspace(0.3, 0.85, 1000), 36000)
+
+    with callProfiler() as prof:
+        w.flightDrag(fc, 0.12, 0.4, 0., 0.8, 0.8)
+    stats = prof.stats()
+
+    assert stats["wing.flightDrag"]["maxbatch"] == 1000
+    assert stats["surface.surfaceCd0"]["calls"] == 1
+    assert stats["surface.surfaceCd0"]["maxbatch"] == 1000
+    # the originals are back in the defining and the importing modules
+    assert flightModule.flight is flight and wingModule.flight is flight and wingModule.surfaceCd0 is surfaceCd0
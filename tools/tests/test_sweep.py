@@ -0,0 +1,41 @@
+# Sweep Cache Tests
+# cached sweeps only evaluate the rows the cache can't serve, even when stored entries have another output layout
+
+
+import numpy as np
+from utils.sweep import sweep
+from utils.diskcache import diskCache
+
+
+# output dtype and the rows of every call of evalRows, changed by the tests
+dtype = "f8"
+rows = []
+
+
+def evalRows(cols):
+    rows.append(len(cols["x"]))
+    return {"y": (2*cols["x"]).astype(dtype)}
+
+
+def test_mixedLayoutOnlyEvaluatesMisses(tmp_path):
+    global dtype
+    cache = diskCache(tmp_path/"cache.sqlite", version="test")
+    x = np.arange(20.)
+
+    # first half cached as float64
+    dtype = "f8"
+    sweep(evalRows, {"x": x[:10]}, workers=1, progress=False, cache=cache)
+
+    # the float64 entries are misses for the float32 layout, but every row is evaluated only once
+    dtype = "f4"
+    del rows[:]
+    out = sweep(evalRows, {"x": x}, workers=1, progress=False, cache=cache)
+    assert sum(rows) == 20
+    assert out["y"].dtype == np.float32 and np.array_equal(out["y"], 2*x)
+
+    # now everything is cached, only the layout probe runs
+    del rows[:]
+    out = sweep(evalRows, {"x": x}, workers=1, progress=False, cache=cache)
+    assert sum(rows) == 1
+    assert out["y"].dtype == np.float32 and np.array_equal(out["y"], 2*x)
+    cache.close()
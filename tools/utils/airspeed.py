@@ -0,0 +1,169 @@
+# Airspeed Conversions
+# batched CAS/EAS/TAS/Mach conversions on top of stdAtmos
+
+
+import numpy as np
+from utils.stdatmos import stdAtmos
+# set up standard atmosphere
+std = stdAtmos()
+
+
+# impact pressure ratio qc/P at M = 1, where the pitot relation switches to Rayleigh
+qcP1 = 1.2**3.5 - 1
+# Rayleigh pitot coefficient for gamma = 1.4, (qc/P + 1) = KR*M^7/(7M^2 - 1)^2.5
+KR = 7.2**3.5/6
+
+
+def qcP(M):
+    """
+    Returns impact pressure over static pressure for Mach M, subsonic isentropic or supersonic Rayleigh pitot.
+    """
+    M = np.asarray(M, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sup = KR*M**7/(7*M**2 - 1)**2.5 - 1
+    return np.where(M <= 1, (1 + 0.2*M**2)**3.5 - 1, sup)[()]
+
+
+def qcP2M(x, tol:float=1e-12, maxiter:int=50):
+    """
+    Returns the Mach number for impact pressure over static pressure x. Subsonic points are closed form, supersonic
+    points are solved together by fixed point iteration on the Rayleigh pitot relation.
+    """
+    x = np.asarray(x, dtype=float)
+    shape = x.shape
+    x = x.ravel()
+    M = np.sqrt(5*((x + 1)**(2/7) - 1))
+    sup = x > qcP1
+    if np.any(sup):
+        xs = x[sup]
+        Ms = M[sup]
+        for _ in range(maxiter):
+            Mn = np.sqrt(7**2.5/KR*(xs + 1)*(1 - 1/(7*Ms**2))**2.5)
+            done = np.max(np.abs(Mn - Ms)) < tol
+            Ms = Mn
+            if done:
+                break
+        M[sup] = Ms
+    return M.reshape(shape)[()]
+
+
+class airspeed():
+    """
+    Batched airspeed conversions at a set of altitudes. The atmosphere is evaluated once when the object is made and
+    shared by every conversion, speeds broadcast against the altitude array. Speeds are in ft/s (m/s for an SI
+    atmosphere).
+
+    Methods
+    -------
+    toMach(V, frm)
+        Returns Mach number from a "tas", "eas", "cas" or "mach" speed.
+    fromMach(M, to)
+        Returns a "tas", "eas", "cas" or "mach" speed from Mach number.
+    convert(V, frm, to)
+        Converts V between any two of "tas", "eas", "cas" and "mach".
+    """
+
+    kinds = ("tas", "eas", "cas", "mach")
+
+    def __init__(self, h, atmos:stdAtmos=None):
+        """
+        Parameters
+        ----------
+        h : float or np.ndarray
+            Altitude (ft).
+        atmos : stdAtmos
+            Atmosphere to use, std day by default.
+        """
+        atmos = std if atmos is None else atmos
+        st = atmos.state(h)
+        self.h = h
+        self.a = st.a
+        self.P = st.P
+        # calibrated and equivalent airspeed always reference the standard sea level values
+        self.P0 = atmos.P0*atmos.scale["P"]
+        self.a0 = atmos.a0*atmos.scale["a"]
+        self.sqrtsigma = np.sqrt(st.rho/(atmos.rho0*atmos.scale["rho"]))
+
+
+    def _check(self, kind:str):
+        """
+        Raises a ValueError for an unknown airspeed kind.
+        """
+        if kind not in self.kinds:
+            raise ValueError(f"unknown airspeed kind {kind!r}, use one of {self.kinds}")
+
+
+    def toMach(self, V, frm:str):
+        """
+        Parameters
+        ----------
+        V : float or np.ndarray
+            Speed (ft/s) or Mach number.
+        frm : str
+            "tas", "eas", "cas" or "mach".
+
+        Returns
+        -------
+        M : float or np.ndarray
+            Mach number.
+        """
+        self._check(frm)
+        V = np.asarray(V, dtype=float)
+        if frm == "mach":
+            return V[()]
+        if frm == "tas":
+            return V/self.a
+        if frm == "eas":
+            return V/(self.sqrtsigma*self.a)
+        # cas -> impact pressure -> Mach
+        qc = self.P0*qcP(V/self.a0)
+        return qcP2M(qc/self.P)
+
+
+    def fromMach(self, M, to:str):
+        """
+        Parameters
+        ----------
+        M : float or np.ndarray
+            Mach number.
+        to : str
+            "tas", "eas", "cas" or "mach".
+
+        Returns
+        -------
+        V : float or np.ndarray
+            Speed (ft/s) or Mach number.
+        """
+        self._check(to)
+        M = np.asarray(M, dtype=float)
+        if to == "mach":
+            return M[()]
+        if to == "tas":
+            return M*self.a
+        if to == "eas":
+            return M*self.a*self.sqrtsigma
+        # Mach -> impact pressure -> cas
+        qc = self.P*qcP(M)
+        return self.a0*qcP2M(qc/self.P0)
+
+
+    def convert(self, V, frm:str, to:str):
+        """
+        Parameters
+        ----------
+        V : float or np.ndarray
+            Speed (ft/s) or Mach number.
+        frm : str
+            Kind of V, "tas", "eas", "cas" or "mach".
+        to : str
+            Kind to return, "tas", "eas", "cas" or "mach".
+
+        Returns
+        -------
+        V : float or np.ndarray
+            Converted speed (ft/s) or Mach number.
+        """
+        if frm == to:
+            self._check(frm)
+            return np.asarray(V, dtype=float)[()]
+        return self.fromMach(self.toMach(V, frm), to)
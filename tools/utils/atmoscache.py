@@ -0,0 +1,158 @@
+# Cached Standard Atmosphere
+# bounded LRU memoization of atmosphere queries for design loops that keep asking for the same altitude
+
+
+import functools
+import numpy as np
+from collections import OrderedDict
+from utils.stdatmos import stdAtmos
+
+
+class lruCache():
+    """
+    Bounded least recently used cache with hit, miss, and eviction counters.
+
+    Methods
+    -------
+    get(key, fn)
+        Returns the cached value for key, calling fn() to fill it on a miss.
+    stats()
+        Returns the cache counters.
+    clear()
+        Empties the cache and resets the counters.
+    """
+
+    def __init__(self, maxsize:int=1024):
+        """
+        Parameters
+        ----------
+        maxsize : int
+            Max number of entries kept before the least recently used one is evicted.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def __len__(self):
+        return len(self._data)
+
+
+    def get(self, key, fn):
+        """
+        Parameters
+        ----------
+        key : hashable
+            Cache key.
+        fn : function
+            Called with no arguments to compute the value on a miss.
+
+        Returns
+        -------
+        value
+            Cached or freshly computed value.
+        """
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            value = fn()
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            return value
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+
+    def stats(self):
+        """
+        Returns
+        -------
+        stats : dict
+            hits, misses, evictions, current size, maxsize, and hit rate.
+        """
+        calls = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._data),
+                "maxsize": self.maxsize, "hitrate": self.hits/calls if calls else 0.}
+
+
+    def clear(self):
+        """
+        Empties the cache and resets the counters.
+        """
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+class cachedAtmos():
+    """
+    Memoizing wrapper around a stdAtmos (or tableAtmos) instance. Scalar and 0-d altitude queries of the properties in
+    cachedAtmos.cached are cached by method, altitude, and atmosphere definition, array queries are passed straight
+    through. Every other attribute (scale, P0, units, ceiling, presAlt(), ...) comes from the wrapped atmosphere. A
+    cache can be shared between wrappers of different atmospheres since the atmosphere definition is part of the key.
+    
+    A hit costs about 2 us, about the same as stdAtmos's own scalar lookup (1-2 us a property, 3.5 us for state()), so
+    wrapping a plain stdAtmos gains little. It pays for atmospheres with costly scalar queries, e.g. a tableAtmos
+    state() drops from about 80 us to a 2 us hit. Pass it as the atmos of flight(), aircraft.drag(), or the component
+    drag methods, or set design.flight.std = cachedAtmos(tableAtmos()) to make it the default for all of them.
+
+    Methods
+    -------
+    Same as stdAtmos, plus:
+    stats()
+        Returns the cache hit, miss, and eviction counters.
+    """
+
+    # altitude properties memoized for scalar h
+    cached = ("state", "T", "P", "PR", "TR", "rho", "dR", "sqrtdR", "Aspeed", "velA", "aR", "qMs", "spW", "VRkin")
+
+    def __init__(self, atmos:stdAtmos=None, maxsize:int=1024, cache:lruCache=None):
+        """
+        Parameters
+        ----------
+        atmos : stdAtmos
+            Atmosphere to wrap, std day by default.
+        maxsize : int
+            Max cached entries when a new cache is made.
+        cache : lruCache
+            Existing cache to share, overrides maxsize.
+        """
+        self.atmos = stdAtmos() if atmos is None else atmos
+        self.cache = lruCache(maxsize) if cache is None else cache
+        self._key = self.atmos.key()
+        # bound up front so a lookup doesn't go through __getattr__ and make a new function every call
+        for name in cachedAtmos.cached:
+            self.__dict__[name] = functools.partial(self._call, name)
+
+
+    def __getattr__(self, name:str):
+        # only called for names the wrapper itself doesn't have
+        if name == "atmos":
+            raise AttributeError(name)
+        return getattr(self.atmos, name)
+
+
+    def _call(self, name:str, h):
+        """
+        Returns atmos.name(h), from the cache when h is a scalar.
+        """
+        fn = getattr(self.atmos, name)
+        if not isinstance(h, (float, int)) and np.ndim(h) != 0:
+            return fn(h)
+        return self.cache.get((self._key, name, float(h)), lambda: fn(h))
+
+
+    def stats(self):
+        """
+        Returns the cache hit, miss, and eviction counters.
+        """
+        return self.cache.stats()
@@ -0,0 +1,98 @@
+# Non-Standard Day Atmospheres
+# ISA +- dT atmospheres with their own layer tables, cached so trade studies can reuse them
+
+
+import numpy as np
+from utils.stdatmos import stdAtmos, layerTables, ziSTD, LiSTD, TiSTD, PoSTD, g0, W0, R
+from utils.atmoscache import lruCache
+
+
+# atmospheres built by dayAtmos(), keyed on the offset at each layer base
+_days = lruCache(64)
+
+
+def dayAtmos(dT=0., units:str="imperial"):
+    """
+    Returns the atmosphere for a day dT (K) off standard. Pressure at each layer base is re-integrated from sea level
+    for the new temperatures, sea level pressure, T0, rho0, and a0 stay standard so TR, aR, etc. remain ratios to the
+    standard day. Instances are cached and reused across calls.
+
+    Parameters
+    ----------
+    dT : float or list
+        Temperature offset (K). A float gives a constant ISA + dT day, a list with one offset per layer base in ziSTD
+        gives a custom profile such as a hot, cold, or tropical day (lapse rates are recomputed between bases).
+    units : str
+        Unit system of the atmosphere, "imperial" or "si".
+
+    Returns
+    -------
+    atmos : stdAtmos
+        Atmosphere with recomputed layer tables.
+    """
+    dT = np.broadcast_to(np.asarray(dT, dtype=float), (len(ziSTD),))
+    return _days.get((units,) + tuple(float(d) for d in dT), lambda: _build(dT, units))
+
+
+def _build(dT:np.ndarray, units:str):
+    """
+    Builds the stdAtmos for per layer base offsets dT (K).
+    """
+    Ti = np.asarray(TiSTD) + dT
+    Li = list(np.diff(Ti)/np.diff(ziSTD))
+    Ti, Pi = layerTables(ziSTD, Li, Ti[0], PoSTD)
+    return stdAtmos(zi=ziSTD, Li=Li, Ti=Ti, Pi=Pi, units=units)
+
+
+def dayGrid(prop:str, h, dT, units:str="imperial"):
+    """
+    Evaluates a stdAtmos property over every combination of altitude and constant temperature offset in one
+    vectorized pass, the offsets are broadcast through the layer base temperatures and pressures so each altitude is
+    looked up once.
+
+    Parameters
+    ----------
+    prop : str
+        stdAtmos method name, e.g. "rho", "VRkin" or "state".
+    h : float or np.ndarray
+        Altitude (ft or m).
+    dT : float or np.ndarray
+        Constant temperature offsets (K).
+    units : str
+        Unit system, "imperial" or "si".
+
+    Returns
+    -------
+    value : np.ndarray or atmosState
+        Property with shape h.shape + dT.shape (an atmosState of such arrays for "state").
+    """
+    return getattr(_gridAtmos(dT, units), prop)(h)
+
+
+class _gridAtmos(stdAtmos):
+    """
+    Standard atmosphere whose layer base temperatures and pressures carry trailing axes of constant temperature
+    offsets, so one layer lookup per altitude gives every offset at once. A constant offset leaves the lapse rates
+    alone, only Ti and the re-integrated Pi change, and the ratios stay ratios to the standard day like dayAtmos(dT).
+    """
+
+    def __init__(self, dT:np.ndarray, units:str="imperial"):
+        self._dT = np.asarray(dT, dtype=float)
+        # layerTables() broadcasts an array of sea level temperatures through every layer
+        Ti, Pi = layerTables(ziSTD, LiSTD, TiSTD[0] + self._dT, PoSTD)
+        super().__init__(zi=ziSTD, Li=LiSTD, Ti=np.broadcast_arrays(*Ti), Pi=np.broadcast_arrays(*Pi), units=units)
+
+
+    def _base(self, h):
+        """
+        Single layer lookup of stdAtmos._base() broadcast over the offsets, shape h.shape + dT.shape.
+        """
+        zh, zi, i = self._start(h)
+        ex = (...,) + (None,)*self._dT.ndim
+        dz = (zh - zi)[ex]
+        Li = self._Li[i][ex]
+        Ti = self._Ti[i]
+        T = Ti + Li*dz
+        Pgrad = self._Pi[i]*(Ti/T)**self._Pex[i][ex]
+        Piso = self._Pi[i]*np.exp(-(g0*W0*dz)/(R*Ti))
+        return T, np.where(Li != 0, Pgrad, Piso)
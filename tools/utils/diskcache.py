@@ -0,0 +1,275 @@
+# Persistent Result Cache
+# content addressed on disk cache of sweep results, keyed by the inputs, the model source, and the atmosphere
+
+
+import ast
+import time
+import inspect
+import sqlite3
+import hashlib
+import numpy as np
+from pathlib import Path
+from utils.stdatmos import stdAtmos
+
+
+# source files the drag buildup depends on, relative to tools/
+modelFiles = ("utils/stdatmos.py", "utils/units.py", "utils/quadrature.py", "design/flight.py", "design/status.py",
+              "design/surface.py", "design/wing.py", "design/fuse.py", "design/tail.py", "design/aircraft.py")
+
+
+def modelVersion(atmos:stdAtmos=None, files:tuple=modelFiles):
+    """
+    Returns a hash of the model source files and the atmosphere definition, any edit to the code or a different
+    atmosphere gives a new version so cached results from the old one are never used.
+
+    Parameters
+    ----------
+    atmos : stdAtmos
+        Atmosphere the results are computed with, std day by default.
+    files : tuple
+        Source files relative to tools/.
+    """
+    atmos = stdAtmos() if atmos is None else atmos
+    root = Path(__file__).resolve().parents[1]
+    h = hashlib.sha256(repr(atmos.key()).encode())
+    for f in files:
+        h.update(f.encode())
+        h.update((root/f).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def fnVersion(fn):
+    """
+    Returns a hash of an evaluation function's source, or of its bytecode when the source isn't available, so editing
+    the function itself also gives new keys.
+    """
+    try:
+        src = inspect.getsource(fn).encode()
+    except (OSError, TypeError):
+        code = getattr(fn, "__code__", None)
+        src = code.co_code + repr(code.co_consts).encode() if code is not None else repr(fn).encode()
+    return hashlib.sha256(src).hexdigest()[:16]
+
+
+def rowKeys(cols:dict, namespace:str=""):
+    """
+    Returns the sha256 of every row of a set of columns, hashed from the column names and float64 values so the same
+    inputs always give the same key on any machine.
+    """
+    names = sorted(cols)
+    n = len(cols[names[0]]) if names else 0
+    rows = np.empty((n, len(names)), dtype="<f8")
+    for j, k in enumerate(names):
+        rows[:, j] = cols[k]
+    prefix = (namespace + "|" + ",".join(names) + "|").encode()
+    return [hashlib.sha256(prefix + r.tobytes()).hexdigest() for r in rows]
+
+
+def layout(out:dict):
+    """
+    Returns the record dtype of a dict of output arrays whose first axis is rows.
+    """
+    return np.dtype([(k, np.asarray(v).dtype, np.shape(v)[1:]) for k, v in out.items()])
+
+
+def records(out:dict, n:int):
+    """
+    Returns a dict of output arrays with first axis n as a numpy structured array, one record per row.
+    """
+    rec = np.empty(n, dtype=layout(out))
+    for k, v in out.items():
+        rec[k] = v
+    return rec
+
+
+class diskCache():
+    """
+    Content addressed result cache in a sqlite file. Each entry is one point's outputs stored as a row of a numpy
+    structured array along with its dtype, keyed by the hash of its inputs in a namespace (the evaluation function,
+    its source, and the model version). The least recently used entries are evicted when the file's data grows past
+    maxbytes. The file can be shared between runs and people, results from other model versions just never match.
+
+    Methods
+    -------
+    namespace(fn)
+        Returns the key namespace of an evaluation function at the current model version.
+    getMany(cols, namespace, layout)
+        Looks up every row of a set of input columns at once.
+    putMany(cols, out, namespace)
+        Stores the outputs of every row of a set of input columns.
+    evict()
+        Drops least recently used entries until the cache fits in maxbytes.
+    stats()
+        Returns the hit, miss, and eviction counters and the cache size.
+    clear()
+        Deletes every entry and resets the counters.
+    close()
+        Closes the cache file.
+    """
+
+    def __init__(self, path:str, maxbytes:int=2**30, version:str=None):
+        """
+        Parameters
+        ----------
+        path : str
+            Cache file, made if it doesn't exist.
+        maxbytes : int
+            Max bytes of stored results before the least recently used are evicted.
+        version : str
+            Model version in every key, modelVersion() by default.
+        """
+        if maxbytes < 1:
+            raise ValueError("maxbytes must be at least 1")
+        self.path = Path(path)
+        self.maxbytes = maxbytes
+        self.version = modelVersion() if version is None else version
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        # write ahead logging lets several sweeps read the same file while one writes
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS records (key TEXT PRIMARY KEY, dtype TEXT, value BLOB, size INTEGER, used REAL);
+            CREATE INDEX IF NOT EXISTS recordsUsed ON records (used);
+        """)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def namespace(self, fn):
+        """
+        Returns the key namespace of fn, its module, name, and source hash at this cache's model version.
+        """
+        return f"{fn.__module__}.{fn.__qualname__}:{fnVersion(fn)}@{self.version}"
+
+
+    def getMany(self, cols:dict, namespace:str, layout:np.dtype=None):
+        """
+        This method looks up every row of cols in a few bulk queries. Every entry is decoded with the dtype it was
+        stored with, and only entries of one record layout count as hits so the columns it returns are consistent.
+
+        Parameters
+        ----------
+        cols : dict
+            1D input columns.
+        namespace : str
+            From namespace().
+        layout : np.dtype
+            Record dtype the hits must have, by default the one most of the found entries have.
+
+        Returns
+        -------
+        hit : np.ndarray
+            True for the rows that were found.
+        out : dict
+            Output columns of the rows found, in row order, None if none were.
+        """
+        keys = rowKeys(cols, namespace)
+        found = {}
+        now = time.time()
+        with self._db:
+            # mark the found entries used in the same batches
+            for i in range(0, len(keys), 900):
+                batch = keys[i:i + 900]
+                marks = ",".join("?"*len(batch))
+                found.update((k, (d, v)) for k, d, v in self._db.execute(
+                    f"SELECT key, dtype, value FROM records WHERE key IN ({marks})", batch))
+                self._db.execute(f"UPDATE records SET used = ? WHERE key IN ({marks})", [now, *batch])
+
+        # entries stored with another layout are misses
+        descr = repr(layout.descr) if layout is not None else None
+        if descr is None and found:
+            descrs = [d for d, _ in found.values()]
+            descr = max(set(descrs), key=descrs.count)
+        hit = np.array([k in found and found[k][0] == descr for k in keys], dtype=bool)
+        self.hits += int(hit.sum())
+        self.misses += int((~hit).sum())
+        if not hit.any():
+            return hit, None
+
+        # decode the records
+        dtype = np.lib.format.descr_to_dtype(ast.literal_eval(descr))
+        rec = np.frombuffer(b"".join(found[k][1] for k, h in zip(keys, hit) if h), dtype=dtype)
+        return hit, {k: rec[k].reshape((len(rec),) + dtype[k].shape) for k in dtype.names}
+
+
+    def putMany(self, cols:dict, out:dict, namespace:str):
+        """
+        This method stores the outputs of every row of cols, then evicts if the cache is over maxbytes.
+
+        Parameters
+        ----------
+        cols : dict
+            1D input columns.
+        out : dict
+            Output arrays whose first axis matches the columns.
+        namespace : str
+            From namespace().
+        """
+        keys = rowKeys(cols, namespace)
+        if not keys:
+            return
+        rec = records(out, len(keys))
+        raw = rec.tobytes()
+        size = rec.dtype.itemsize
+        descr = repr(rec.dtype.descr)
+        now = time.time()
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)",
+                                 [(k, descr, raw[i*size:(i + 1)*size], size, now) for i, k in enumerate(keys)])
+        self.evict()
+
+
+    def evict(self):
+        """
+        This method drops the least recently used entries until the stored bytes fit in maxbytes.
+
+        Returns
+        -------
+        n : int
+            Number of entries evicted.
+        """
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM records").fetchone()[0]
+        if total <= self.maxbytes:
+            return 0
+        drop = []
+        for key, size in self._db.execute("SELECT key, size FROM records ORDER BY used"):
+            if total <= self.maxbytes:
+                break
+            drop.append((key,))
+            total -= size
+        with self._db:
+            self._db.executemany("DELETE FROM records WHERE key = ?", drop)
+        self.evictions += len(drop)
+        return len(drop)
+
+
+    def stats(self):
+        """
+        Returns
+        -------
+        stats : dict
+            hits, misses, evictions, entries, stored bytes, maxbytes, and hit rate.
+        """
+        entries, nbytes = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM records").fetchone()
+        calls = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": entries,
+                "bytes": nbytes, "maxbytes": self.maxbytes, "hitrate": self.hits/calls if calls else 0.}
+
+
+    def clear(self):
+        """
+        Deletes every entry and resets the counters.
+        """
+        with self._db:
+            self._db.execute("DELETE FROM records")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def close(self):
+        """
+        Closes the cache file.
+        """
+        self._db.close()
@@ -0,0 +1,253 @@
+# Hot Path Instrumentation
+# opt-in per method call counts, cumulative and self time, and batch sizes, exported as JSON or folded stacks
+
+
+import sys
+import json
+import inspect
+import functools
+import numpy as np
+from time import perf_counter
+from utils.stdatmos import stdAtmos
+from design import flight, surface
+from design.wing import wing
+from design.fuse import fuse
+from design.tail import vertTail, horizTail
+
+
+# classes instrumented by default
+defaultClasses = (stdAtmos, wing, fuse, vertTail, horizTail)
+# module functions instrumented by default, as (module, name)
+defaultFunctions = ((flight, "flight"), (surface, "surfaceCd0"))
+
+
+class callProfiler():
+    """
+    Records every call to the methods (including static and private ones) of a set of classes, and to a set of module
+    functions, while enabled. The methods are only wrapped between enable() and disable(), so there is no cost at all
+    when it is off. Batch size is the size of the largest array argument of a call, looking inside tuples (flightCond
+    included), lists and dicts (geometry dicts), 1 when there are none.
+
+    A module function is also swapped out in every loaded module that imported it by name, so flight() and
+    surfaceCd0() show up under the drag methods rather than as their self time. Functions not listed in functions
+    are still counted in the self time of their caller.
+
+    Usage
+    -----
+    with callProfiler() as prof:
+        w.drag(0.82, 36000, 0.12, 0.4, 0., 0.8, 0.8)
+    print(prof.table())
+
+    Methods
+    -------
+    enable()
+        Wraps the methods and starts recording.
+    disable()
+        Restores the original methods.
+    reset()
+        Clears the recorded data.
+    stats()
+        Returns the per method counters.
+    table(sort, limit)
+        Returns the counters as a text table.
+    toJSON(path)
+        Returns or writes the counters and stacks as JSON.
+    folded(path)
+        Returns or writes self time per call stack in the folded format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, classes:tuple=defaultClasses, functions:tuple=defaultFunctions):
+        """
+        Parameters
+        ----------
+        classes : tuple
+            Classes whose methods are recorded.
+        functions : tuple
+            (module, name) pairs of module functions that are recorded.
+        """
+        self.classes = tuple(classes)
+        self.functions = tuple(functions)
+        self._originals = []
+        # the wrappers hold on to these, reset() clears them in place
+        self._stats = {}
+        self._stacks = {}
+        self._stack = []
+        self._active = {}
+
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+
+    def __exit__(self, *exc):
+        self.disable()
+
+
+    def reset(self):
+        """
+        This method clears the recorded data.
+        """
+        self._stats.clear()
+        self._stacks.clear()
+        del self._stack[:]
+        self._active.clear()
+
+
+    def enable(self):
+        """
+        This method wraps every method defined on the classes, dunders other than __init__ are left alone, and the
+        module functions wherever they were imported.
+        """
+        if self._originals:
+            return
+        for cls in self.classes:
+            for name, attr in list(vars(cls).items()):
+                if name.startswith("__") and name != "__init__":
+                    continue
+                key = f"{cls.__name__}.{name}"
+                if isinstance(attr, staticmethod):
+                    new = staticmethod(self._wrap(key, attr.__func__))
+                elif isinstance(attr, classmethod):
+                    new = classmethod(self._wrap(key, attr.__func__))
+                elif inspect.isfunction(attr):
+                    new = self._wrap(key, attr)
+                else:
+                    continue
+                self._originals.append((cls, name, attr))
+                setattr(cls, name, new)
+        for module, name in self.functions:
+            fn = getattr(module, name)
+            new = self._wrap(f"{module.__name__.split('.')[-1]}.{name}", fn)
+            # from-imports hold their own reference, so replace it in every module bound to the same function
+            for m in list(sys.modules.values()):
+                if getattr(m, "__dict__", {}).get(name) is fn:
+                    self._originals.append((m, name, fn))
+                    setattr(m, name, new)
+
+
+    def disable(self):
+        """
+        This method puts the original methods and functions back.
+        """
+        for cls, name, attr in reversed(self._originals):
+            setattr(cls, name, attr)
+        self._originals = []
+
+
+    def _wrap(self, key:str, fn):
+        """
+        Returns fn wrapped to record its calls under key.
+        """
+        stats, stacks, stack, active = self._stats, self._stacks, self._stack, self._active
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            s = stats.get(key)
+            if s is None:
+                s = stats[key] = {"calls": 0, "cumtime": 0., "selftime": 0., "minbatch": None, "maxbatch": 0,
+                                  "points": 0}
+            n = max(_batch(args), _batch(kwargs))
+            stack.append([key, 0.])
+            active[key] = active.get(key, 0) + 1
+            t0 = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                dt = perf_counter() - t0
+                path = tuple(f[0] for f in stack)
+                _, child = stack.pop()
+                active[key] -= 1
+                if stack:
+                    stack[-1][1] += dt
+                # recursive calls only count toward the outermost cumulative time
+                s["calls"] += 1
+                if not active[key]:
+                    s["cumtime"] += dt
+                s["selftime"] += dt - child
+                s["minbatch"] = n if s["minbatch"] is None else min(s["minbatch"], n)
+                s["maxbatch"] = max(s["maxbatch"], n)
+                s["points"] += n
+                stacks[path] = stacks.get(path, 0.) + dt - child
+        return wrapper
+
+
+    def stats(self):
+        """
+        Returns
+        -------
+        stats : dict
+            {"Class.method" or "module.function": {calls, cumtime, selftime (s), minbatch, maxbatch, meanbatch, points}} of every method
+            called at least once, points is the summed batch size.
+        """
+        return {k: {**s, "meanbatch": s["points"]/s["calls"]} for k, s in self._stats.items() if s["calls"]}
+
+
+    def table(self, sort:str="selftime", limit:int=None):
+        """
+        Returns the stats as a text table sorted by sort, largest first.
+        """
+        rows = sorted(self.stats().items(), key=lambda kv: kv[1][sort], reverse=True)[:limit]
+        lines = [f"{'method':28s} {'calls':>8s} {'cum (ms)':>10s} {'self (ms)':>10s} {'us/call':>9s} "
+                 f"{'batch min/mean/max':>22s}"]
+        for k, s in rows:
+            lines.append(f"{k:28s} {s['calls']:8d} {s['cumtime']*1e3:10.3f} {s['selftime']*1e3:10.3f} "
+                         f"{s['selftime']/s['calls']*1e6:9.1f} "
+                         f"{s['minbatch']:>7d}/{s['meanbatch']:>7.0f}/{s['maxbatch']:>6d}")
+        return "\n".join(lines)
+
+
+    def toJSON(self, path:str=None):
+        """
+        Returns the stats and the self time (s) of every call stack as a JSON string, and writes it to path if given.
+        """
+        out = json.dumps({"methods": self.stats(),
+                          "stacks": [{"stack": list(k), "selftime": t} for k, t in self._stacks.items()]}, indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(out + "\n")
+        return out
+
+
+    def folded(self, path:str=None):
+        """
+        Returns the self time of every call stack as folded stack lines ("a;b;c microseconds"), the input format of
+        flamegraph.pl, speedscope, and inferno, and writes it to path if given.
+        """
+        out = "\n".join(f"{';'.join(k)} {round(t*1e6)}" for k, t in self._stacks.items())
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(out + "\n")
+        return out
+
+
+def _batch(x):
+    """
+    Returns the size of the largest array in x, searching tuples, lists, and dict values, 1 when there is none.
+    """
+    if isinstance(x, np.ndarray):
+        return x.size
+    if isinstance(x, dict):
+        x = x.values()
+    elif not isinstance(x, (tuple, list)):
+        return 1
+    return max((_batch(v) for v in x), default=1)
+
+
+if __name__ == "__main__":
+    w = wing()
+    w.planform(714.3, 8, 0.35, 31.5)
+    f = fuse()
+    f.PSCylGen(7, 11.5, [0.3, 0.2], 0.6)
+    v = vertTail(w, f)
+    v.planform(0.06, 0.45, 0.55, 40, 1.2)
+
+    # one scalar drag call of each, then a batch
+    with callProfiler() as prof:
+        w.drag(0.82, 36000, 0.12, 0.4, 0., 0.8, 0.8)
+        f.PSCylDrag(f, 0.82, 36000, 714.3)
+        v.drag(0.82, 36000, 0.12, 0.35)
+        w.dragSurface(np.linspace(0.3, 0.85, 1000), 36000, 0.12, 0.4, 0., 0.8, 0.8)
+    print(prof.table(limit=15))
+    print()
+    print(prof.folded())
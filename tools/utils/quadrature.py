@@ -0,0 +1,108 @@
+# Batched Adaptive Quadrature
+# Gauss-Kronrod 7-15 with bisection, run on many integrals at once so a batch of designs shares every numpy call
+
+
+import numpy as np
+
+
+# Kronrod nodes on [-1, 1] and weights, the Gauss 7 point rule uses the odd nodes
+_xk = np.array([0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+                0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+                0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+                0.207784955007898467600689403773245, 0.])
+_wk = np.array([0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+                0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+                0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+                0.204432940075298892414161999234649, 0.209482141084727828012999174891714])
+_wg = np.array([0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+                0.381830050505118944950369775488975, 0.417959183673469387755102040816327])
+xk = np.concatenate([-_xk[:-1], _xk[::-1]])
+wk = np.concatenate([_wk[:-1], _wk[::-1]])
+wg = np.zeros(15)
+wg[1::2] = np.concatenate([_wg[:-1], _wg[::-1]])
+
+
+def gk15(f, a, b, k):
+    """
+    Returns the Kronrod estimate and the |Kronrod - Gauss| error estimate of f over each [a, b]. f(x, k) gets x
+    shaped (len(a), 15) and the index k passed along for each row.
+    """
+    c = (a + b)/2
+    h = (b - a)/2
+    y = f(c[:, None] + h[:, None]*xk, k)
+    K = h*(y @ wk)
+    G = h*(y @ wg)
+    return K, np.abs(K - G)
+
+
+def adaptQuad(f, a, b, owner, n:int, rtol:float=1e-8, atol:float=0., maxiter:int=50, smooth:bool=False):
+    """
+    Integrates f over a batch of intervals and sums the results by owner. Every interval is bisected until its error
+    estimate is below its share (by length) of max(rtol*|integral|, atol) for its owner, so the total error estimate
+    of each integral meets the tolerance with as few evaluations as the rule allows. With smooth=True each interval is
+    first mapped through the quintic smoothstep x = a + (b - a)*t^3*(10 - 15t + 6t^2), which flattens algebraic
+    endpoint singularities like x^0.1 or (1 - x)^0.6 so they need a few bisections instead of dozens.
+
+    Parameters
+    ----------
+    f : function
+        Integrand f(x, k), x is an array of points and k the index (into a and b) of the interval each row of x came
+        from.
+    a : np.ndarray
+        Interval lower limits, 1D. Split an integral into several intervals at any kinks so they converge quickly.
+    b : np.ndarray
+        Interval upper limits, 1D.
+    owner : np.ndarray
+        Index of the integral (0 to n - 1) each interval belongs to.
+    n : int
+        Number of integrals.
+    rtol : float
+        Relative tolerance on each integral.
+    atol : float
+        Absolute tolerance on each integral.
+    maxiter : int
+        Max bisection levels, intervals still unconverged after it are accepted as is.
+    smooth : bool
+        Apply the smoothstep change of variables to every interval.
+
+    Returns
+    -------
+    I : np.ndarray
+        Integrals, length n.
+    err : np.ndarray
+        Error estimates, length n.
+    nevals : np.ndarray
+        Number of integrand evaluations used for each integral.
+    """
+    a, b, owner = np.asarray(a, dtype=float), np.asarray(b, dtype=float), np.asarray(owner)
+    I = np.zeros(n)
+    err = np.zeros(n)
+    nevals = np.zeros(n, dtype=int)
+    width = np.bincount(owner, b - a, minlength=n)
+    # k tracks the interval each piece was bisected from
+    k = np.arange(len(a))
+    scale = np.ones(len(a))
+    if smooth:
+        a0, scale, fx = a, b - a, f
+        def f(t, k):
+            x = a0[k, None] + scale[k, None]*t**3*(10 - 15*t + 6*t**2)
+            return fx(x, k)*scale[k, None]*30*t**2*(1 - t)**2
+        a, b = np.zeros(len(a)), np.ones(len(a))
+    tol = None
+    for i in range(maxiter + 1):
+        K, E = gk15(f, a, b, k)
+        o = owner[k]
+        nevals += 15*np.bincount(o, minlength=n)
+        if tol is None:
+            # the first pass sets each integral's tolerance
+            with np.errstate(invalid="ignore", divide="ignore"):
+                tol = np.maximum(rtol*np.abs(np.bincount(o, K, minlength=n)), atol)/width
+        done = (E <= tol[o]*(b - a)*scale[k]) | (i == maxiter)
+        I += np.bincount(o[done], K[done], minlength=n)
+        err += np.bincount(o[done], E[done], minlength=n)
+        if np.all(done):
+            break
+        a, b, k = a[~done], b[~done], k[~done]
+        m = (a + b)/2
+        a, b, k = np.concatenate([a, m]), np.concatenate([m, b]), np.concatenate([k, k])
+    return I, err, nevals
@@ -4,7 +4,10 @@
 # i stole dis from class (notes)
 
 
+import math
 import numpy as np
+from bisect import bisect_right
+from collections import namedtuple
 import utils.units as uu
 
 
@@ -19,25 +22,82 @@ ToSTD = 288.15                                                  # T0 for std day
 PoSTD = 101325.                                                 # P0 for std day (Pa)
 rhooSTD = 1.225                                                 # rho0 for std day (kg/m^3)
 aoSTD = 340.3                                                   # a0 for std day (m/s)
-# Ti at each i for std day (K)
-TiSTD = [ToSTD]
-for i in range(1, len(LiSTD)+1):
-    TiSTD.append(LiSTD[i - 1]*(ziSTD[i] - ziSTD[i - 1]) + TiSTD[i - 1])
-# Pi at each i for std day (Pa)
-PiSTD = [PoSTD]
-for k in range(1, len(LiSTD)+1):
-    if LiSTD[k - 1] != 0:
-        PiSTD.append(PiSTD[k - 1]*(TiSTD[k - 1]/TiSTD[k])**(g0*W0/(R*LiSTD[k - 1])))
-    else:
-        PiSTD.append(PiSTD[k - 1]*np.exp(-g0*W0*(ziSTD[k]-ziSTD[k - 1])/(R*TiSTD[k - 1])))
+
+
+def layerTables(zi:list, Li:list, T0:float, P0:float):
+    """
+    Builds the temperature and pressure at each layer base by stepping up from sea level.
+    
+    Parameters
+    ----------
+    zi : list
+        Geo-potential altitude markers (m).
+    Li : list
+        Temperature lapse rate at each zi (K/m).
+    T0 : float
+        Temperature at the first marker (K).
+    P0 : float
+        Pressure at the first marker (Pa).
+    
+    Returns
+    -------
+    Ti : list
+        Temperature at each zi (K).
+    Pi : list
+        Pressure at each zi (Pa).
+    """
+    # Ti at each i (K)
+    Ti = [T0]
+    for i in range(1, len(Li)+1):
+        Ti.append(Li[i - 1]*(zi[i] - zi[i - 1]) + Ti[i - 1])
+    # Pi at each i (Pa)
+    Pi = [P0]
+    for k in range(1, len(Li)+1):
+        if Li[k - 1] != 0:
+            Pi.append(Pi[k - 1]*(Ti[k - 1]/Ti[k])**(g0*W0/(R*Li[k - 1])))
+        else:
+            Pi.append(Pi[k - 1]*np.exp(-g0*W0*(zi[k]-zi[k - 1])/(R*Ti[k - 1])))
+    return Ti, Pi
+
+
+# Ti and Pi at each i for std day (K, Pa)
+TiSTD, PiSTD = layerTables(ziSTD, LiSTD, ToSTD, PoSTD)
+
+# single pass atmosphere record returned by stdAtmos.state()
+atmosState = namedtuple("atmosState", ["T", "P", "rho", "a", "mu", "nu", "TR", "PR", "dR", "aR"])
+
+# output scale factors from SI for each unit system, temperature also takes an offset
+unitSystems = {
+    "imperial": {"h": uu.m2ft, "T": uu.k2r, "Toff": -459.67, "P": uu.pa2psf, "rho": uu.kgm32slugft3,
+                 "a": uu.ms2fts, "mu": uu.pa2psf, "nu": uu.pa2psf/uu.kgm32slugft3, "spW": 32.1740484*uu.kgm32slugft3},
+    "si": {"h": 1., "T": 1., "Toff": 0., "P": 1., "rho": 1., "a": 1., "mu": 1., "nu": 1., "spW": g0},
+}
+# Sutherland viscosity in SI, mu = muC*T^1.5/(T + muS) (Pa-s)
+muC = (0.226968*10**(-7))*uu.psf2pa*math.sqrt(uu.k2r)
+muS = 198.73*uu.r2k
 
 
 class stdAtmos():
     """
-    Standard atmosphere 1976 base class - valid to 86 km (282,152 ft).
+    Standard atmosphere 1976 base class - valid to 86 km (282,152 ft). Every method accepts either a scalar altitude or
+    a numpy array of altitudes of any shape and returns a result of the same shape, a scalar or 0-d altitude skips
+    numpy entirely and returns a float. Everything is computed in SI and converted once on the way out, to the imperial
+    units listed below by default or to SI with units="si" (altitude m, T K, P Pa, rho kg/m^3, speeds m/s, mu Pa-s,
+    nu m^2/s, spW N/m^3, qMs Pa).
+   
+    Attributes
+    ----------
+    ceiling : float
+        Geometric altitude (ft or m) of the top of the layer tables, properties above it are extrapolated.
+    qMs0 : float
+        Sea level Q/M^2 (lb/ft^2 or Pa), qMs(h) is qMs0 times the pressure ratio.
    
     Methods
     -------
+    key()
+        Returns a hashable tuple identifying the atmosphere definition.
+    state(h)
+        Returns T, P, rho, a, mu, nu and the T, P, rho and a ratios at h (ft) from one layer lookup.
     T(h)
         Returns atmospheric temperature (deg F) at h (ft).
     P(h)
@@ -64,12 +124,18 @@ class stdAtmos():
         Returns specific weight (lbm/ft^3) at h (ft).
     VRkin(h)
         Returns kinematic viscosity (ft^2/s) at h (ft).
+    presAlt(P)
+        Returns pressure altitude (ft) from pressure (psf).
+    densAlt(rho)
+        Returns density altitude (ft) from density (slugs/ft^3).
+    tempAlt(T)
+        Returns the lowest altitude (ft) with temperature T (deg F).
     z(h)
         Returns geopotential altitude (m) from geometric altitude (m).
     """
    
     def __init__(self, zi:list=ziSTD, Li:list=LiSTD, Ti:list=TiSTD, Pi:list=PiSTD, T0:float=ToSTD, P0:float=PoSTD,
-                rho0:float=rhooSTD, a0:float=aoSTD):
+                rho0:float=rhooSTD, a0:float=aoSTD, units:str="imperial"):
         """
         Parameters
         ----------
@@ -89,7 +155,11 @@ class stdAtmos():
             Density at sea level (kg/m^3).
         a0 : float
             Speed of sound at sea level (m/s).
+        units : str
+            Unit system for altitude inputs and property outputs, "imperial" or "si".
         """
+        if units not in unitSystems:
+            raise ValueError(f"unknown unit system {units!r}, use one of {list(unitSystems)}")
         self.zi = zi
         self.Li = Li
         self.Ti = Ti
@@ -98,150 +168,575 @@ class stdAtmos():
         self.P0 = P0
         self.rho0 = rho0
         self.a0 = a0
+        self.units = units
+        self.scale = unitSystems[units]
+        self._hin = 1/self.scale["h"]
+        
+        # array copies of the layer tables for vectorized lookups
+        self._zi = np.asarray(zi, dtype=float)
+        self._Li = np.asarray(Li, dtype=float)
+        self._Ti = np.asarray(Ti, dtype=float)
+        self._Pi = np.asarray(Pi, dtype=float)
+        # pressure exponent for each gradient layer (unused on isothermal layers)
+        self._Pex = np.zeros_like(self._Li)
+        grad = self._Li != 0
+        self._Pex[grad] = g0*W0/(R*self._Li[grad])
+        # plain float copies for scalar lookups, numpy calls on 0-d arrays cost more than the math itself
+        self._zl, self._Ll, self._Tl, self._Pl, self._Pexl = [t.tolist() for t in (self._zi, self._Li, self._Ti,
+                                                                                  self._Pi, self._Pex)]
+        
+        # reference values used by every ratio, computed once (SI), from T0 and P0 rather than the tables so the
+        # ratios of a non-standard day are still taken against the standard day
+        self._Psl = self.P0
+        self._rhosl = self._rho(self.T0, self.P0)
+        self._asl = self._a(self.T0)
+        self.qMs0 = 1481.354*uu.psf2pa*self.scale["P"]
+        
+        # layer tables for the closed form inverse solvers
+        self._Lsafe = np.where(grad, self._Li, 1.)
+        self._Pinv = np.zeros_like(self._Li)
+        self._Pinv[grad] = 1/self._Pex[grad]
+        self._rinv = np.zeros_like(self._Li)
+        self._rinv[grad] = 1/(self._Pex[grad] + 1)
+        self._rhoi = self._rho(self._Ti, self._Pi)
+        self.ceiling = float(self._h(self._zi[-1]))
+       
+   
+    def key(self):
+        """
+        Returns a hashable tuple identifying this atmosphere definition.
+        """
+        tables = tuple(tuple(float(v) for v in t) for t in (self._zi, self._Li, self._Ti, self._Pi))
+        return ((type(self).__name__,) + tables + (float(self.T0), float(self.P0), float(self.rho0), float(self.a0))
+                + (self.units,))
        
    
-    def _i(self, z:float):
+    def _i(self, z):
         """
         Parameters
         ----------
-        z : float
+        z : float or np.ndarray
             Geo-potential altitude (m).
        
         Returns
         -------
-        i : int
+        i : int or np.ndarray
             Corresponding i value.
+        zi : float or np.ndarray
+            Geo-potential altitude at the base of layer i (m).
         """
-        zi = [zs for zs in self.zi if z >= zs][-1]
-        i = self.zi.index(zi)
-        return i, zi
+        i = np.clip(np.searchsorted(self._zi, z, side="right") - 1, 0, len(self._Li) - 1)
+        return i, self._zi[i]
    
    
-    def _start(self, h:float):
+    def _start(self, h):
         """
         Quickly startup for doing calcs.
         """
-        h = h*uu.ft2m
+        h = np.asarray(h, dtype=float)*self._hin
         zh = self.z(h)
         i, zi = self._i(zh)
         return zh, zi, i
+    
+    
+    def _base(self, h):
+        """
+        Single layer lookup shared by every property.
+        
+        Parameters
+        ----------
+        h : float or np.ndarray
+            Altitude (ft or m).
+        
+        Returns
+        -------
+        T : float or np.ndarray
+            Temperature (K).
+        P : float or np.ndarray
+            Pressure (Pa).
+        """
+        if isinstance(h, (float, int)) or np.ndim(h) == 0:
+            return self._baseScalar(float(h))
+        zh, zi, i = self._start(h)
+        Ti = self._Ti[i]
+        T = Ti + self._Li[i]*(zh - zi)
+        # gradient and isothermal layer forms, picked per point by lapse rate
+        Pgrad = self._Pi[i]*(Ti/T)**self._Pex[i]
+        Piso = self._Pi[i]*np.exp(-(g0*W0*(zh - zi))/(R*Ti))
+        P = np.where(self._Li[i] != 0, Pgrad, Piso)[()]
+        return T, P
+    
+    
+    def _baseScalar(self, h:float):
+        """
+        _base() for a single altitude, bisects the layer tables and uses math instead of numpy.
+        """
+        h = h*self._hin
+        r = 6356.577*1000   # radius of earth (m)
+        zh = r*h/(r + h)
+        i = min(max(bisect_right(self._zl, zh) - 1, 0), len(self._Ll) - 1)
+        Ti, Li, dz = self._Tl[i], self._Ll[i], zh - self._zl[i]
+        T = Ti + Li*dz
+        if not T > 0:
+            # far above the tables, float powers of a negative temperature would go complex
+            return math.nan, math.nan
+        if Li != 0:
+            return T, self._Pl[i]*(Ti/T)**self._Pexl[i]
+        return T, self._Pl[i]*math.exp(-(g0*W0*dz)/(R*Ti))
+    
+    
+    def _rho(self, T, P):
+        """
+        Returns density (kg/m^3) from temperature (K) and pressure (Pa).
+        """
+        return self.rho0*((P/self._Psl)/(T/self.T0))
+    
+    
+    def _a(self, T):
+        """
+        Returns speed of sound (m/s) from temperature (K).
+        """
+        return self.a0*(T/self.T0)**0.5
+    
+    
+    @staticmethod
+    def _mu(T):
+        """
+        Returns dynamic viscosity (Pa-s) from temperature (K).
+        """
+        return muC*T*T**0.5/(T + muS)
+    
+    
+    def state(self, h):
+        """
+        Evaluates every atmospheric property at h (ft) from a single layer lookup.
+        
+        Parameters
+        ----------
+        h : float or np.ndarray
+            Altitude (ft).
+        
+        Returns
+        -------
+        state : atmosState
+            Named tuple of T (deg F), P (psf), rho (slugs/ft^3), a (ft/s), mu (slugs/ft-s), nu (ft^2/s) and the
+            ratios TR, PR, dR and aR, each shaped like h.
+        """
+        T, P = self._base(h)
+        return self._state(T, P, self._rho(T, P), self._a(T), self._mu(T))
+    
+    
+    def _state(self, T, P, rho, a, mu):
+        """
+        Converts SI T, P, rho, a and mu to an atmosState in the output units.
+        """
+        s = self.scale
+        return atmosState(T=T*s["T"] + s["Toff"], P=P*s["P"], rho=rho*s["rho"], a=a*s["a"], mu=mu*s["mu"],
+                          nu=mu/rho*s["nu"], TR=T/self.T0, PR=P/self._Psl, dR=rho/self._rhosl, aR=a/self._asl)
    
 
-    def T(self, h:float):
+    def T(self, h):
         """
         Returns atmospheric temperature (deg F) at h (ft).
         """
-        zh, zi, i = self._start(h)
-        T = self.Ti[i] + self.Li[i]*(zh - zi)
-        return uu.k2degF(T)
+        T, _ = self._base(h)
+        return T*self.scale["T"] + self.scale["Toff"]
 
 
-    def P(self, h:float):
+    def P(self, h):
         """
         Returns atmospheric pressure (psf) at h (ft).
         """
-        zh, zi, i = self._start(h)
-        if self.Li[i] != 0:
-            P = self.Pi[i]*(self.Ti[i]/(uu.degF2k(self.T(h))))**(g0*W0/(R*self.Li[i]))
-        else:
-            P = self.Pi[i]*np.exp(-(g0*W0*(zh - zi))/(R*self.Ti[i]))
-        return P*uu.pa2psf
+        _, P = self._base(h)
+        return P*self.scale["P"]
    
    
-    def PR(self, h:float):
+    def PR(self, h):
         """
         Returns pressure ratio at h (ft).
         """
-        return self.P(h)/self.P(0.)
+        _, P = self._base(h)
+        return P/self._Psl
    
    
-    def TR(self, h:float):
+    def TR(self, h):
         """
         Returns temperature ratio at h (ft).
         """
-        return uu.degF2k(self.T(h))/self.T0
+        T, _ = self._base(h)
+        return T/self.T0
        
        
-    def rho(self, h:float):
+    def rho(self, h):
         """
         Returns density (slugs/ft^3) at h (ft).
         """
-        return self.rho0*(self.PR(h)/self.TR(h))*uu.kgm32slugft3
+        return self._rho(*self._base(h))*self.scale["rho"]
    
    
-    def dR(self, h:float):
+    def dR(self, h):
         """
         Returns density ratio at h (ft).
         """
-        return self.rho(h)/self.rho(0.)
+        return self._rho(*self._base(h))/self._rhosl
    
    
-    def sqrtdR(self, h:float):
+    def sqrtdR(self, h):
         """
         Returns square root of density ratio at h (ft).
         """
-        return np.sqrt(self.dR(h))
+        return self.dR(h)**0.5
    
    
-    def Aspeed(self, h:float):
+    def Aspeed(self, h):
         """
         Returns speed of sound (ft/s) at h (ft).
         """
-        return self.a0*np.sqrt(self.TR(h))*uu.ms2fts
+        T, _ = self._base(h)
+        return self._a(T)*self.scale["a"]
    
    
-    def velA(self, h:float):
+    def velA(self, h):
         """
         Returns speed of sound (kt) at h (ft).
         """
-        return self.Aspeed(h)*uu.fts2kt
+        T, _ = self._base(h)
+        return self._a(T)/uu.kt2ms
    
    
-    def aR(self, h:float):
+    def aR(self, h):
         """
         Returns speed of sound ratio at h (ft).
         """
-        return self.Aspeed(h)/self.Aspeed(0.)
+        T, _ = self._base(h)
+        return self._a(T)/self._asl
    
    
-    def qMs(self, h:float):
+    def qMs(self, h):
         """
         Returns Q/M^2 (lb/ft^2) at h (ft).
         """
-        return 1481.354*self.PR(h)
+        return self.qMs0*self.PR(h)
        
    
-    def spW(self, h:float):
+    def spW(self, h):
         """
         Returns specific weight (lbm/ft^3) at h (ft).
         """
-        return 32.1740484*self.rho(h)
+        return self._rho(*self._base(h))*self.scale["spW"]
        
    
-    def VRkin(self, h:float):
+    def VRkin(self, h):
         """
         Returns kinematic viscosity (ft^2/s) at h (ft).
         """
-        return ((0.226968*10**(-7))*(uu.degF2r(self.T(h))**1.5))/(self.rho(h)*(uu.degF2r(self.T(h))+198.73))
+        T, P = self._base(h)
+        return self._mu(T)/self._rho(T, P)*self.scale["nu"]
+   
+   
+    def _h(self, z):
+        """
+        Returns geometric altitude (ft or m) from geo-potential altitude (m).
+        """
+        r = 6356.577*1000   # radius of earth (m)
+        return r*z/(r - z)*self.scale["h"]
+   
+   
+    def presAlt(self, P):
+        """
+        Returns pressure altitude (ft) for pressure P (psf). Inverted in closed form within each layer.
+        """
+        P = np.asarray(P, dtype=float)/self.scale["P"]
+        # pressure falls with altitude so search the negated layer table
+        i = np.clip(np.searchsorted(-self._Pi[:-1], -P, side="right") - 1, 0, len(self._Li) - 1)
+        zi, Ti, Pi = self._zi[i], self._Ti[i], self._Pi[i]
+        zgrad = zi + (Ti*(Pi/P)**self._Pinv[i] - Ti)/self._Lsafe[i]
+        ziso = zi - R*Ti/(g0*W0)*np.log(P/Pi)
+        return self._h(np.where(self._Li[i] != 0, zgrad, ziso)[()])
+   
+   
+    def densAlt(self, rho):
+        """
+        Returns density altitude (ft) for density rho (slugs/ft^3). Inverted in closed form within each layer.
+        """
+        rho = np.asarray(rho, dtype=float)/self.scale["rho"]
+        i = np.clip(np.searchsorted(-self._rhoi[:-1], -rho, side="right") - 1, 0, len(self._Li) - 1)
+        zi, Ti, rhoi = self._zi[i], self._Ti[i], self._rhoi[i]
+        # rho/rhoi = (Ti/T)**(Pex + 1) on gradient layers and P/Pi on isothermal ones
+        zgrad = zi + (Ti*(rhoi/rho)**self._rinv[i] - Ti)/self._Lsafe[i]
+        ziso = zi - R*Ti/(g0*W0)*np.log(rho/rhoi)
+        return self._h(np.where(self._Li[i] != 0, zgrad, ziso)[()])
+   
+   
+    def tempAlt(self, T):
+        """
+        Returns the lowest altitude (ft) at which temperature T (deg F) occurs, nan if it never does. Isothermal layers
+        return their base altitude.
+        """
+        T = (np.asarray(T, dtype=float) - self.scale["Toff"])/self.scale["T"]
+        z = np.full_like(T, np.nan)
+        # walk the layers bottom up and keep the first one that brackets T (to round-off)
+        for k in range(len(self._Li)):
+            if self._Li[k] != 0:
+                zk = self._zi[k] + (T - self._Ti[k])/self._Li[k]
+                ok = (zk >= self._zi[k] - 1e-6) & (zk <= self._zi[k + 1] + 1e-6)
+            else:
+                zk = self._zi[k]
+                ok = np.abs(T - self._Ti[k]) <= 1e-9*self._Ti[k]
+            z = np.where(np.isnan(z) & ok, zk, z)
+        return self._h(z[()])
    
    
     @staticmethod
-    def z(h:float):
+    def z(h):
         """
         Parameters
         ----------
-        h : float
+        h : float or np.ndarray
             Geometric height (m).
            
         Returns
         -------
-        z : float
+        z : float or np.ndarray
             Geo-potential altitude (m).
         """
         r = 6356.577*1000   # radius of earth (m)
         z = r*h/(r + h)     # geopot height        
         return z
+
+
+class tableAtmos(stdAtmos):
+    """
+    Table-backed standard atmosphere for large array sweeps. T, P, rho, a and nu are fit at construction with piecewise
+    cubics on a uniform altitude grid that is split at every layer boundary, then evaluated by indexed interpolation
+    instead of the analytic layer formulas. The grid is refined until the fit error against stdAtmos is below tol.
+    Valid between the bottom and top of the layer tables (0 to 282,152 ft for std day), outside that range values
+    are extrapolated from the end cells. The tables hold SI values and share stdAtmos's output unit conversion.
+   
+    Attributes
+    ----------
+    maxRelErr : dict
+        Max relative error of T, P, rho, a and nu against stdAtmos, measured at construction.
+    dh : float
+        Final grid spacing (ft or m).
+    """
     
+    # cubic coefficients from values at t = 0, 1/3, 2/3, 1 within a cell
+    _Vinv = np.linalg.inv(np.vander(np.arange(4)/3, 4, increasing=True))
+    _cols = ["T", "P", "rho", "a", "nu"]
+    
+    def __init__(self, tol:float=1e-8, dh:float=5000., **kwargs):
+        """
+        Parameters
+        ----------
+        tol : float
+            Max allowed relative error of any tabulated property.
+        dh : float
+            Starting grid spacing (ft or m), halved until tol is met.
+        kwargs
+            Atmosphere definition passed to stdAtmos.
+        """
+        super().__init__(**kwargs)
+        
+        # layer boundaries in geometric altitude (ft or m)
+        self._hb = self._h(self._zi)
+        
+        # refine until the measured error meets tol
+        while True:
+            self._build(dh)
+            self.maxRelErr = self._error()
+            if max(self.maxRelErr.values()) <= tol:
+                break
+            dh /= 2
+            if dh < 1.:
+                raise ValueError(f"tableAtmos can not reach tol={tol:g}")
+        self.tol = tol
+        self.dh = dh
+        
+        
+    def key(self):
+        """
+        Returns a hashable tuple identifying this atmosphere definition and its table tolerance.
+        """
+        return super().key() + (float(self.tol),)
+        
+        
+    def _exact(self, h):
+        """
+        Returns the analytic T (K), P (Pa), rho (kg/m^3), a (m/s) and nu (m^2/s) at h (ft or m), stacked on the last
+        axis.
+        """
+        T, P = self._base(h)
+        rho = self._rho(T, P)
+        return np.stack([T, P, rho, self._a(T), self._mu(T)/rho], axis=-1)
+    
+    
+    def _build(self, dh:float):
+        """
+        Builds the cell tables for a grid spacing of dh (ft or m).
+        """
+        lo, hi = self._hb[0], self._hb[-1]
+        nb = int(np.ceil((hi - lo)/dh))
+        bins = np.linspace(lo, hi, nb + 1)
+        
+        # cell edges are the bin edges plus any layer boundary that doesn't already sit on one
+        inner = self._hb[1:-1]
+        gap = np.abs(inner[:, None] - bins[None, :]).min(axis=1)
+        edges = np.union1d(bins, inner[gap > 1e-6*dh])
+        
+        # first cell in each bin and where the bin splits into a second cell (inf if it doesn't)
+        first = np.searchsorted(edges, bins[:-1])
+        nxt = edges[np.minimum(first + 1, len(edges) - 1)]
+        split = np.where(nxt < bins[1:] - 1e-6*dh, nxt, np.inf)
+        
+        # sample every cell at its 4 cubic nodes and solve for the coefficients
+        h0 = edges[:-1]
+        w = np.diff(edges)
+        nodes = h0[:, None] + w[:, None]*(np.arange(4)/3)
+        coef = np.einsum("ij,cjp->pic", self._Vinv, self._exact(nodes))
+        
+        self._lo = lo
+        self._binv = nb/(hi - lo)
+        self._nb = nb
+        self._first = first
+        self._split = split
+        self._h0 = h0
+        self._iw = 1/w
+        self._coef = {col: coef[p] for p, col in enumerate(self._cols)}
+        
+        
+    def _cell(self, h):
+        """
+        Returns the cell index and local coordinate t (0 to 1) of each h (ft or m).
+        """
+        h = np.asarray(h, dtype=float)
+        j = np.clip(((h - self._lo)*self._binv).astype(np.intp), 0, self._nb - 1)
+        c = np.take(self._first, j) + (h >= np.take(self._split, j))
+        t = (h - np.take(self._h0, c))*np.take(self._iw, c)
+        return c, t
+    
+    
+    def _eval(self, col:str, c, t):
+        """
+        Evaluates the cubic for one tabulated property.
+        """
+        C = self._coef[col]
+        v = np.take(C[3], c)
+        for k in (2, 1, 0):
+            v *= t
+            v += np.take(C[k], c)
+        return v[()]
+    
+    
+    def _error(self):
+        """
+        Returns the max relative error of each tabulated property, checked inside every cell at the 3 extrema of the
+        cubic interpolation error (t = 1/2 and 1/2 +- sqrt(5)/6) plus 8 evenly spaced points.
+        """
+        ts = np.concatenate(([0.5 - np.sqrt(5)/6, 0.5, 0.5 + np.sqrt(5)/6], (np.arange(8) + 0.5)/8))
+        h = (self._h0[:, None] + ts[None, :]/self._iw[:, None]).ravel()
+        exact = self._exact(h)
+        c, t = self._cell(h)
+        return {col: float(np.max(np.abs(self._eval(col, c, t)/exact[:, p] - 1)))
+                for p, col in enumerate(self._cols)}
+    
+    
+    def state(self, h):
+        """
+        Evaluates every atmospheric property at h (ft) from the tables.
+        
+        Parameters
+        ----------
+        h : float or np.ndarray
+            Altitude (ft).
+        
+        Returns
+        -------
+        state : atmosState
+            Named tuple of T (deg F), P (psf), rho (slugs/ft^3), a (ft/s), mu (slugs/ft-s), nu (ft^2/s) and the
+            ratios TR, PR, dR and aR, each shaped like h.
+        """
+        c, t = self._cell(h)
+        T, P, rho, a, nu = [self._eval(col, c, t) for col in self._cols]
+        return self._state(T, P, rho, a, nu*rho)
+    
+    
+    def T(self, h):
+        """
+        Returns atmospheric temperature (deg F) at h (ft).
+        """
+        return self._eval("T", *self._cell(h))*self.scale["T"] + self.scale["Toff"]
+    
+    
+    def P(self, h):
+        """
+        Returns atmospheric pressure (psf) at h (ft).
+        """
+        return self._eval("P", *self._cell(h))*self.scale["P"]
+    
+    
+    def PR(self, h):
+        """
+        Returns pressure ratio at h (ft).
+        """
+        return self._eval("P", *self._cell(h))/self._Psl
+    
+    
+    def TR(self, h):
+        """
+        Returns temperature ratio at h (ft).
+        """
+        return self._eval("T", *self._cell(h))/self.T0
+    
+    
+    def rho(self, h):
+        """
+        Returns density (slugs/ft^3) at h (ft).
+        """
+        return self._eval("rho", *self._cell(h))*self.scale["rho"]
+    
+    
+    def dR(self, h):
+        """
+        Returns density ratio at h (ft).
+        """
+        return self._eval("rho", *self._cell(h))/self._rhosl
+    
+    
+    def spW(self, h):
+        """
+        Returns specific weight (lbm/ft^3) at h (ft).
+        """
+        return self._eval("rho", *self._cell(h))*self.scale["spW"]
+    
+    
+    def Aspeed(self, h):
+        """
+        Returns speed of sound (ft/s) at h (ft).
+        """
+        return self._eval("a", *self._cell(h))*self.scale["a"]
+    
+    
+    def velA(self, h):
+        """
+        Returns speed of sound (kt) at h (ft).
+        """
+        return self._eval("a", *self._cell(h))/uu.kt2ms
+    
+    
+    def aR(self, h):
+        """
+        Returns speed of sound ratio at h (ft).
+        """
+        return self._eval("a", *self._cell(h))/self._asl
+    
+    
+    def VRkin(self, h):
+        """
+        Returns kinematic viscosity (ft^2/s) at h (ft).
+        """
+        return self._eval("nu", *self._cell(h))*self.scale["nu"]
+
 
 if __name__ == "__main__":
     test = stdAtmos()
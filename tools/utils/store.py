@@ -0,0 +1,251 @@
+# Columnar Result Store
+# one raw binary file per field plus a json metadata file, written in chunks and read back memory mapped
+
+
+import json
+import numpy as np
+from pathlib import Path
+
+
+def _descr(dtype:np.dtype):
+    """
+    Returns a json friendly description of a dtype.
+    """
+    return np.lib.format.dtype_to_descr(np.dtype(dtype))
+
+
+def _dtype(descr):
+    """
+    Inverse of _descr().
+    """
+    return np.lib.format.descr_to_dtype(descr if isinstance(descr, str) else [tuple(d) for d in descr])
+
+
+class storeWriter():
+    """
+    Streaming writer of a columnar store directory. Rows are written in chunks, either appended in order or written at
+    an offset so several processes can fill disjoint row ranges of the same store at once, and nothing but the chunk
+    being written is held in memory.
+
+    Usage
+    -----
+    with storeWriter("runs/sweep1", overwrite=True) as w:
+        for chunk in chunks:
+            w.append(chunk)
+
+    Methods
+    -------
+    define(fields, rows)
+        Sets the fields and sizes the store for rows rows.
+    append(cols)
+        Writes a chunk after the last row.
+    write(start, cols)
+        Writes a chunk starting at row start.
+    close(complete)
+        Saves the metadata.
+    """
+
+    def __init__(self, path:str, overwrite:bool=False):
+        """
+        Parameters
+        ----------
+        path : str
+            Store directory, made if it doesn't exist.
+        overwrite : bool
+            Delete an existing store's files instead of adding to it.
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta = self.path/"meta.json"
+        if meta.exists() and overwrite:
+            for name in json.loads(meta.read_text())["fields"]:
+                (self.path/f"{name}.bin").unlink(missing_ok=True)
+            meta.unlink()
+        if meta.exists():
+            m = json.loads(meta.read_text())
+            self.fields = {k: (_dtype(f["dtype"]), tuple(f["shape"])) for k, f in m["fields"].items()}
+            self.rows = m["rows"]
+            self.attrs = m.get("attrs", {})
+        else:
+            self.fields = {}
+            self.rows = 0
+            self.attrs = {}
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc, *args):
+        self.close(complete=exc is None)
+
+
+    def define(self, fields:dict, rows:int=0):
+        """
+        This method sets the store's fields and makes their files, sized (sparse where the filesystem allows) for rows
+        rows so write() can fill them in any order.
+
+        Parameters
+        ----------
+        fields : dict
+            {name: (dtype, shape of one row)} or {name: example array whose first axis is rows}.
+        rows : int
+            Number of rows to make room for.
+        """
+        if self.fields:
+            raise ValueError(f"store at {self.path} already has fields")
+        for name, f in fields.items():
+            if "/" in name or "\\" in name or name == "meta":
+                raise ValueError(f"bad field name {name}")
+            if isinstance(f, tuple):
+                self.fields[name] = (np.dtype(f[0]), tuple(f[1]))
+            else:
+                self.fields[name] = (np.asarray(f).dtype, np.shape(f)[1:])
+            (self.path/f"{name}.bin").touch()
+        self._resize(rows)
+        self._save(False)
+
+
+    def _resize(self, rows:int):
+        """
+        Grows every field file to rows rows.
+        """
+        if rows > self.rows:
+            for name, (dtype, shape) in self.fields.items():
+                with open(self.path/f"{name}.bin", "r+b") as f:
+                    f.truncate(rows*dtype.itemsize*int(np.prod(shape)))
+            self.rows = rows
+
+
+    def write(self, start:int, cols:dict):
+        """
+        This method writes one chunk of some or all of the fields at row start, fields not in cols are left as they
+        are. The store grows if the chunk goes past the end, define() it at full size first when several processes
+        write.
+
+        Parameters
+        ----------
+        start : int
+            First row of the chunk.
+        cols : dict
+            Chunk of the fields, first axis is rows.
+        """
+        if not self.fields:
+            self.define(cols)
+        if not set(cols) <= set(self.fields):
+            raise KeyError(f"chunk fields {sorted(set(cols) - set(self.fields))} aren't in the store")
+        m = {len(v) for v in cols.values()}
+        if len(m) != 1:
+            raise ValueError("chunk fields must have the same number of rows")
+        m = m.pop()
+        self._resize(start + m)
+        for name in cols:
+            dtype, shape = self.fields[name]
+            x = np.ascontiguousarray(np.broadcast_to(cols[name], (m,) + shape), dtype=dtype)
+            with open(self.path/f"{name}.bin", "r+b") as f:
+                f.seek(start*dtype.itemsize*int(np.prod(shape)))
+                f.write(x.tobytes())
+
+
+    def append(self, cols:dict):
+        """
+        This method writes one chunk of every field after the last row and saves the metadata, so the store can be
+        read while it is still being written.
+        """
+        if self.fields and set(cols) != set(self.fields):
+            raise KeyError(f"chunk fields {sorted(cols)} don't match the store's {sorted(self.fields)}")
+        self.write(self.rows, cols)
+        self._save(False)
+
+
+    def close(self, complete:bool=True):
+        """
+        This method saves the metadata, complete marks the store as finished.
+        """
+        self._save(complete)
+
+
+    def _save(self, complete:bool):
+        meta = {"rows": self.rows, "complete": complete, "attrs": self.attrs,
+                "fields": {k: {"dtype": _descr(d), "shape": list(s)} for k, (d, s) in self.fields.items()}}
+        tmp = self.path/"meta.json.tmp"
+        tmp.write_text(json.dumps(meta, indent=2) + "\n")
+        tmp.replace(self.path/"meta.json")
+
+
+class columnStore():
+    """
+    Read only view of a store made by storeWriter. Every field is a memory mapped array, so opening a store and
+    slicing it copies nothing and only the pages actually touched are read from disk.
+
+    Methods
+    -------
+    store[name]
+        Returns the memory mapped array of a field.
+    chunks(size, fields)
+        Yields the store in chunks of rows as dicts of memory mapped slices.
+    where(fn, size)
+        Returns the rows where fn(chunk) is True, evaluated a chunk at a time.
+    take(rows, fields)
+        Returns the given rows of the fields as in memory arrays.
+    """
+
+    def __init__(self, path:str):
+        """
+        Parameters
+        ----------
+        path : str
+            Store directory.
+        """
+        self.path = Path(path)
+        meta = json.loads((self.path/"meta.json").read_text())
+        self.rows = meta["rows"]
+        self.complete = meta["complete"]
+        self.attrs = meta.get("attrs", {})
+        self.fields = {k: (_dtype(f["dtype"]), tuple(f["shape"])) for k, f in meta["fields"].items()}
+        self._maps = {}
+
+
+    def __len__(self):
+        return self.rows
+
+
+    def __contains__(self, name:str):
+        return name in self.fields
+
+
+    def __getitem__(self, name:str):
+        if name not in self._maps:
+            dtype, shape = self.fields[name]
+            if self.rows == 0:
+                self._maps[name] = np.empty((0,) + shape, dtype=dtype)
+            else:
+                self._maps[name] = np.memmap(self.path/f"{name}.bin", dtype=dtype, mode="r",
+                                             shape=(self.rows,) + shape)
+        return self._maps[name]
+
+
+    def chunks(self, size:int=2**20, fields:list=None):
+        """
+        This method yields {name: memory mapped slice} chunks of size rows, for streaming post processing.
+        """
+        fields = list(self.fields) if fields is None else fields
+        for i in range(0, self.rows, size):
+            yield {k: self[k][i:i + size] for k in fields}
+
+
+    def where(self, fn, size:int=2**20):
+        """
+        This method returns the indices of the rows where fn(chunk) is True, fn gets the chunks() dicts so only a
+        chunk of the fields it reads is ever in memory, e.g. store.where(lambda c: c["drag_total"] < 2500).
+        """
+        idx = [i*size + np.flatnonzero(fn(c)) for i, c in enumerate(self.chunks(size))]
+        return np.concatenate(idx) if idx else np.zeros(0, dtype=int)
+
+
+    def take(self, rows, fields:list=None):
+        """
+        This method returns rows (indices or a boolean mask) of the fields copied into memory.
+        """
+        fields = list(self.fields) if fields is None else fields
+        return {k: np.asarray(self[k][rows]) for k in fields}
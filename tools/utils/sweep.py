@@ -0,0 +1,228 @@
+# Parallel Design Sweeps
+# chunked process pool runner that merges results back into columnar arrays in input order
+
+
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from utils.store import storeWriter, columnStore
+from utils.diskcache import layout
+
+
+def grid(**ranges):
+    """
+    Returns every combination of the given 1D ranges as flat columns, the last range varies fastest.
+
+    Parameters
+    ----------
+    **ranges : np.ndarray
+        Values of each parameter, e.g. grid(S=np.linspace(600, 800, 11), ar=[7, 8, 9]).
+
+    Returns
+    -------
+    cols : dict
+        One 1D column per parameter.
+    """
+    mesh = np.meshgrid(*[np.asarray(v, dtype=float) for v in ranges.values()], indexing="ij")
+    return {k: m.ravel() for k, m in zip(ranges, mesh)}
+
+
+def sample(n:int, seed:int=0, **bounds):
+    """
+    Returns a latin hypercube sample of n points inside the given bounds, each parameter's range is split into n
+    strata and every stratum is hit once.
+
+    Parameters
+    ----------
+    n : int
+        Number of points.
+    seed : int
+        Random seed, the same seed gives the same sample.
+    **bounds : tuple
+        (low, high) of each parameter.
+
+    Returns
+    -------
+    cols : dict
+        One 1D column per parameter.
+    """
+    rng = np.random.default_rng(seed)
+    cols = {}
+    for k, (lo, hi) in bounds.items():
+        u = (rng.permutation(n) + rng.random(n))/n
+        cols[k] = lo + (hi - lo)*u
+    return cols
+
+
+class _progress():
+    """
+    Prints sweep progress to stderr on one line.
+    """
+
+    def __init__(self, nchunks:int, npoints:int):
+        self.nchunks = nchunks
+        self.npoints = npoints
+        self.t0 = time.perf_counter()
+
+
+    def __call__(self, done:int, points:int):
+        dt = time.perf_counter() - self.t0
+        left = dt*(self.npoints - points)/points if points else 0.
+        sys.stderr.write(f"\rsweep: {done}/{self.nchunks} chunks, {points}/{self.npoints} points, {dt:.1f} s, "
+                         f"~{left:.1f} s left")
+        if done == self.nchunks:
+            sys.stderr.write("\n")
+        sys.stderr.flush()
+
+
+def _fill(out:dict, m:int):
+    """
+    Broadcasts a chunk's outputs to its m rows, outputs that don't depend on the varied inputs may come back
+    unbroadcast.
+    """
+    return {k: np.broadcast_to(v, (m,) + np.shape(v)[1:]) for k, v in out.items()}
+
+
+def _storeChunk(fn, path:str, start:int, cols:dict):
+    """
+    Evaluates fn on one chunk in a worker and writes its outputs straight into the store at the chunk's rows.
+    """
+    storeWriter(path).write(start, _fill(fn(cols), len(next(iter(cols.values())))))
+
+
+def _run(fn, cols:dict, slices:list, workers:int, progress, store:str=None):
+    """
+    Evaluates fn over the chunks of cols in slices and returns its output columns in input order, or writes them to
+    the store at path store and returns nothing.
+    """
+    # results are put back by chunk index
+    results = [None]*len(slices)
+    report = _progress(len(slices), sum(sl.stop - sl.start for sl in slices)) if progress is True else progress
+    task = (lambda sl, c: (_storeChunk, fn, store, sl.start, c)) if store else (lambda sl, c: (fn, c))
+    done, points = 0, 0
+    if workers == 1:
+        for i, sl in enumerate(slices):
+            f, *args = task(sl, {k: v[sl] for k, v in cols.items()})
+            results[i] = f(*args)
+            done, points = done + 1, points + sl.stop - sl.start
+            if report:
+                report(done, points)
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = {pool.submit(*task(sl, {k: v[sl] for k, v in cols.items()})): i for i, sl in enumerate(slices)}
+            for fut in as_completed(futures):
+                i = futures[fut]
+                results[i] = fut.result()
+                done, points = done + 1, points + slices[i].stop - slices[i].start
+                if report:
+                    report(done, points)
+    if store:
+        return {}
+
+    # merge into columns
+    out = {}
+    if results:
+        results = [_fill(r, sl.stop - sl.start) for r, sl in zip(results, slices)]
+        for k in results[0]:
+            out[k] = np.concatenate([r[k] for r in results])
+    return out
+
+
+def _slices(n:int, workers:int, chunksize:int):
+    """
+    Returns contiguous chunks of n points, about 4 per worker when chunksize is None.
+    """
+    chunksize = max(1, -(-n//(4*workers))) if chunksize is None else chunksize
+    return [slice(i, min(i + chunksize, n)) for i in range(0, n, chunksize)]
+
+
+def sweep(fn, cols:dict, workers:int=None, chunksize:int=None, progress=True, cache=None, store:str=None):
+    """
+    Evaluates fn over a set of points in chunks on a process pool and merges the results in input order, so the
+    output doesn't depend on the worker count, chunk size, or which worker finishes first.
+
+    Parameters
+    ----------
+    fn : function
+        Vectorized evaluation, fn(cols) takes a dict of 1D columns for one chunk and returns a dict of arrays whose
+        first axis matches the chunk length. It must be importable (a module level function) so workers can unpickle
+        it.
+    cols : dict
+        1D input columns of equal length, e.g. from grid() or sample().
+    workers : int
+        Number of worker processes, all cores by default. 1 runs in this process with no pool.
+    chunksize : int
+        Points per chunk, by default enough for about 4 chunks per worker so the load balances.
+    progress : bool or function
+        Print progress to stderr, or a function called as progress(chunks done, points done) after every chunk.
+    cache : utils.diskcache.diskCache
+        Persistent result cache, every point is looked up in bulk first and only the misses are evaluated (and then
+        stored). fn is run on the first point up front so entries stored with another output layout are misses.
+    store : str
+        Directory of a utils.store columnar store to write the results to instead of returning them, for sweeps too
+        big for memory. Any existing store there is replaced. Each worker writes its chunks straight into the store.
+
+    Returns
+    -------
+    out : dict or utils.store.columnStore
+        Input columns followed by fn's output columns, all in input order, or the memory mapped store.
+    """
+    cols = {k: np.asarray(v) for k, v in cols.items()}
+    lens = {len(v) for v in cols.values()}
+    if len(lens) != 1 or any(v.ndim != 1 for v in cols.values()):
+        raise ValueError("cols must be 1D arrays of equal length")
+    n = lens.pop()
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if chunksize is not None and chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    if store is not None:
+        if cache is not None:
+            raise ValueError("sweep can use a cache or a store, not both")
+        return _sweepStore(fn, cols, n, workers, chunksize, progress, store)
+    if cache is None or n == 0:
+        return {**cols, **_run(fn, cols, _slices(n, workers, chunksize), workers, progress)}
+
+    # evaluate the first row here to learn fn's output layout, only entries stored with it count as hits
+    ns = cache.namespace(fn)
+    probe = _fill(fn({k: v[:1] for k, v in cols.items()}), 1)
+    hit, cached = cache.getMany(cols, ns, layout(probe))
+
+    # only evaluate what the cache doesn't have, the first row is already done
+    rest = ~hit
+    rest[0] = False
+    new = _run(fn, {k: v[rest] for k, v in cols.items()}, _slices(int(rest.sum()), workers, chunksize), workers,
+               progress) if rest.any() else {}
+    if not hit[0]:
+        new = {k: np.concatenate([probe[k], new[k]]) if new else probe[k] for k in probe}
+    if new:
+        cache.putMany({k: v[~hit] for k, v in cols.items()}, new, ns)
+    out = dict(cols)
+    for k, x in (new or cached or {}).items():
+        col = np.empty((n,) + x.shape[1:], dtype=x.dtype)
+        if new:
+            col[~hit] = new[k]
+        if cached:
+            col[hit] = cached[k]
+        out[k] = col
+    return out
+
+
+def _sweepStore(fn, cols:dict, n:int, workers:int, chunksize:int, progress, store:str):
+    """
+    sweep() into a columnar store, the first chunk is evaluated here to get the output fields.
+    """
+    slices = _slices(n, workers, chunksize)
+    with storeWriter(store, overwrite=True) as w:
+        if slices:
+            first = _fill(fn({k: v[slices[0]] for k, v in cols.items()}), slices[0].stop)
+            if set(first) & set(cols):
+                raise KeyError(f"outputs {sorted(set(first) & set(cols))} have the same names as inputs")
+            w.define({**cols, **first}, n)
+            w.write(0, cols)
+            w.write(0, first)
+            _run(fn, cols, slices[1:], workers, progress, store)
+    return columnStore(store)
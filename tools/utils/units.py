@@ -19,6 +19,7 @@
 # THE SOFTWARE.
 
 import math
+from fractions import Fraction
 
 # distances
 
@@ -171,15 +172,11 @@ kt2ms = kt2fts * fts2ms
 
 
 def tas2eas(tas, atmosphere, z_m):
-    import numpy as np
-    _, _, s = atmosphere.getRatios(z_m)
-    return tas * np.sqrt(s)
+    return tas * atmosphere.sqrtdR(z_m * atmosphere.scale["h"])
 
 
 def eas2tas(eas, atmosphere, z_m):
-    import numpy as np
-    _, _, s = atmosphere.getRatios(z_m)
-    return eas / np.sqrt(s)
+    return eas / atmosphere.sqrtdR(z_m * atmosphere.scale["h"])
 
 
 # accels
@@ -339,4 +336,76 @@ def gauge2sqin(gauge):
     :param gauge: AWG (for aught, they should be negative)
     :return: square inches
     '''
-    return math.pi * (gauge2diam(gauge)/2)**2
\ No newline at end of file
+    return math.pi * (gauge2diam(gauge)/2)**2
+
+# conversion registry
+# each unit maps to (scale, offset) onto its dimension's SI unit, x_si = scale*x + offset
+# every entry is an exact Fraction built from the defining constants (international foot and inch, nautical mile,
+# pound force, 550 ft-lbf/s hp) so any pair folds exactly, the one measured value is slug/ft^3 which takes this
+# module's kgm32slugft3 as exact
+_ft, _in, _lbf = Fraction("0.3048"), Fraction("0.0254"), Fraction("4.4482216152605")
+
+
+def _unit(scale, offset=0):
+    '''
+    Returns a registry entry with scale and offset as Fractions.
+    '''
+    return Fraction(scale), Fraction(offset)
+
+
+unitRegistry = {
+    "length": {"m": _unit(1), "cm": _unit(Fraction(1, 100)), "mm": _unit(Fraction(1, 1000)), "km": _unit(1000),
+               "in": _unit(_in), "ft": _unit(_ft), "mi": _unit(5280*_ft), "nmi": _unit(1852)},
+    "area": {"m2": _unit(1), "ft2": _unit(_ft**2), "in2": _unit(_in**2)},
+    "speed": {"m/s": _unit(1), "ft/s": _unit(_ft), "kt": _unit(Fraction(1852, 3600)), "mph": _unit(5280*_ft/3600),
+              "km/h": _unit(Fraction(1000, 3600)), "ft/min": _unit(_ft/60)},
+    "pressure": {"Pa": _unit(1), "kPa": _unit(1000), "psf": _unit(_lbf/_ft**2), "psi": _unit(_lbf/_in**2),
+                 "atm": _unit(101325)},
+    "density": {"kg/m3": _unit(1), "slug/ft3": _unit(1/Fraction("0.00194032"))},
+    "temperature": {"K": _unit(1), "R": _unit(Fraction(5, 9)), "degC": _unit(1, Fraction("273.15")),
+                    "degF": _unit(Fraction(5, 9), Fraction("459.67")*Fraction(5, 9))},
+    "power": {"W": _unit(1), "kW": _unit(1000), "hp": _unit(550*_lbf*_ft), "ftlb/s": _unit(_lbf*_ft)},
+    "torque": {"Nm": _unit(1), "ftlb": _unit(_lbf*_ft), "inlb": _unit(_lbf*_in), "inoz": _unit(_lbf*_in/16)},
+    "energy": {"J": _unit(1), "kJ": _unit(1000), "ftlb": _unit(_lbf*_ft), "Wh": _unit(3600), "kWh": _unit(3600000)},
+}
+
+_resolved = {}
+
+
+def resolve(frm, to):
+    '''
+    Resolves a unit pair to one affine transform, cached after the first call. The two maps through the SI unit are
+    folded exactly and rounded once, so e.g. 32 degF converts to exactly 0 degC.
+
+    :param frm: unit to convert from, e.g. "degF"
+    :param to: unit to convert to, e.g. "K"
+    :return: (scale, offset) so that to_value = scale*from_value + offset
+    '''
+    try:
+        return _resolved[(frm, to)]
+    except KeyError:
+        pass
+    for units in unitRegistry.values():
+        if frm in units and to in units:
+            a1, b1 = units[frm]
+            a2, b2 = units[to]
+            _resolved[(frm, to)] = (float(a1/a2), float((b1 - b2)/a2))
+            return _resolved[(frm, to)]
+    raise ValueError(f"can not convert {frm!r} to {to!r}")
+
+
+def convert(x, frm, to):
+    '''
+    Converts a value or array between two units of the same dimension.
+
+    :param x: value or numpy array in frm units
+    :param frm: unit to convert from
+    :param to: unit to convert to
+    :return: x in to units, one multiply (and add for offset units)
+    '''
+    scale, offset = resolve(frm, to)
+    if offset == 0.0:
+        return x * scale
+    y = x * scale
+    y += offset
+    return y